@@ -0,0 +1,59 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback
+    orjson = None
+
+
+# Angular transfer-state escaping used inside <script id="app-root-state">
+_ENTITY_RE = re.compile(rb'&([aqslg]);')
+_ENTITIES = {b'a': b'&', b'q': b'"', b's': b"'", b'l': b'<', b'g': b'>'}
+
+_MARKER = b'app-root-state'
+
+
+def find_app_root_state(html):
+    """
+    Locate the raw app-root-state payload by scanning the byte buffer.
+    Returns the script body as bytes, or None if the tag is missing.
+    """
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+
+    marker = html.find(_MARKER)
+    while marker != -1:
+        tag_start = html.rfind(b'<script', 0, marker)
+        tag_end = html.find(b'>', marker)
+        # The marker must sit inside the opening <script ...> tag itself
+        if tag_start != -1 and tag_end != -1 and html.rfind(b'>', tag_start, marker) == -1:
+            body_end = html.find(b'</script>', tag_end)
+            if body_end == -1:
+                return None
+            return html[tag_end + 1:body_end]
+        marker = html.find(_MARKER, marker + len(_MARKER))
+    return None
+
+
+def unescape_state(payload):
+    """Undo the transfer-state entity encoding in a single pass."""
+    return _ENTITY_RE.sub(lambda m: _ENTITIES[m.group(1)], payload)
+
+
+def loads(payload):
+    """Decode JSON bytes with orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def extract_app_root_state(html):
+    """
+    Extract and decode the app-root-state JSON from a scorecard page.
+    Returns None if the script tag is missing; raises ValueError on bad JSON.
+    """
+    payload = find_app_root_state(html)
+    if payload is None:
+        return None
+    return loads(unescape_state(payload.strip()))
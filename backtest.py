@@ -0,0 +1,202 @@
+"""
+Historical replay of the StopLossTarget strategy engine.
+
+Recorded ticks (CSV or Parquet with timestamp, token, price columns in
+time order; spot rows use the index name as token, e.g. "Nifty 50") are
+streamed in fixed-size batches through the same entry and exit code as
+live trading, driven by a replay clock instead of wall-clock time, so
+memory stays bounded however long the file. Days run in parallel across
+processes.
+
+A parameter sweep is just several strategies in one config, e.g.
+{'sl1_tgt2': {..., 'sl_pct_or_point': '1', 'tgt_pct_or_point': '2'}, ...}.
+
+Usage: python backtest.py --contracts NSE_FO.csv --config config.ini day1.parquet day2.parquet ...
+"""
+import argparse
+import asyncio
+import itertools
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from market_data import MarketDataAdapter
+from testing import (ContractProcessor, StopLossTarget, StopLossTargetOptionEntryTrack, get_ini_details, logger,
+                     to_expiry_date)
+from trade_journal import TradeJournal
+
+
+TICK_COLUMNS = ['timestamp', 'token', 'price']
+
+
+def iter_ticks(path, batch_size=100_000):
+    """Stream a recorded tick file as DataFrames of at most batch_size rows."""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        chunks = (batch.to_pandas() for batch in
+                  pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=TICK_COLUMNS))
+    else:
+        chunks = pd.read_csv(path, usecols=TICK_COLUMNS, dtype={'token': str}, chunksize=batch_size)
+    for df in chunks:
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        df['token'] = df['token'].astype(str)
+        yield df
+
+
+class ReplayMarket(MarketDataAdapter):
+    """Replay clock plus the latest recorded price per token or index as of that clock."""
+
+    def __init__(self):
+        self.now = None
+        self.prices = {}
+
+    def clock(self):
+        return self.now
+
+    def get_spot(self, symbol):
+        return self.prices[symbol]
+
+    def get_quotes(self, tokens):
+        return {token: self.prices[str(token)] for token in tokens}
+
+
+def nearest_expiry(contract_df, day, symbol='NIFTY'):
+    expiries = contract_df.loc[contract_df['TckrSymb'] == symbol, 'XpryDt'].dt.date
+    upcoming = expiries[expiries >= day]
+    return upcoming.min() if len(upcoming) else None
+
+
+async def replay_day(ticks, strategies, contract_df, contract_index=None, expiry=None, journal=None):
+    """
+    Replay one day of ticks as fast as the CPU allows. ticks is a DataFrame
+    or an iterable of DataFrame batches in timestamp order (see iter_ticks).
+    Returns a summary with exit counts and MTM per strategy.
+    """
+    if isinstance(ticks, pd.DataFrame):
+        ticks = [ticks]
+    batches = (batch for batch in ticks if not batch.empty)
+    first = next(batches, None)
+    if first is None:
+        return {'day': None, 'legs': 0, 'exits': {}, 'pnl': {}}
+
+    market = ReplayMarket()
+    day_start = first['timestamp'].iloc[0].to_pydatetime()
+    market.now = day_start.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    engine = StopLossTarget(contract_df, contract_index, journal=journal or TradeJournal(),
+                            clock=market.clock, market_data=market)
+    engine.expiry_date = to_expiry_date(expiry) if expiry is not None else nearest_expiry(contract_df, market.now.date())
+
+    tracker = StopLossTargetOptionEntryTrack(contract_df, sl_tg_obj=engine)
+    for key, trade_book in strategies.items():
+        tracker._append_in_queue(key, dict(trade_book))
+    await tracker.mapping_the_trade()
+    scheduler = tracker.build_entry_schedule(market.now)
+
+    carry = None  # rows at the last timestamp of a batch; the next batch may continue them
+    for batch in itertools.chain([first], batches):
+        if carry is not None:
+            if batch['timestamp'].iloc[0] < carry['timestamp'].iloc[0]:
+                raise ValueError("Tick batches are not in timestamp order")
+            batch = pd.concat([carry, batch], ignore_index=True)
+        timestamps = batch['timestamp'].to_numpy()
+        if (timestamps[1:] < timestamps[:-1]).any():
+            raise ValueError("Tick file is not sorted by timestamp")
+        bounds = np.flatnonzero(timestamps[1:] != timestamps[:-1]) + 1
+        held = bounds[-1] if len(bounds) else 0
+        await _replay_rows(engine, market, scheduler, batch.iloc[:held])
+        carry = batch.iloc[held:]
+    await _replay_rows(engine, market, scheduler, carry)
+
+    # Data ran out: step the clock through every remaining exit time so all
+    # open legs close (and are journaled) on the last prices seen
+    next_exit = engine.book.next_exit_ts()
+    while next_exit is not None:
+        market.now = pd.Timestamp.fromtimestamp(next_exit).to_pydatetime()
+        await engine._process_tick_batch({}, market.now.strftime('%H:%M:%S'))
+        next_exit = engine.book.next_exit_ts()
+    await engine.journal.close()
+
+    return {
+        'day': day_start.date().isoformat(),
+        'legs': len(engine.book) + sum(engine.exit_counts.values()),
+        'exits': dict(engine.exit_counts),
+        'pnl': engine.strategy_mtm(),
+    }
+
+
+async def _replay_rows(engine, market, scheduler, ticks):
+    """Advance the replay clock through ticks one timestamp at a time: entries first, then exits."""
+    if ticks.empty:
+        return
+    timestamps = ticks['timestamp'].to_numpy()
+    tokens = ticks['token'].to_numpy()
+    prices = ticks['price'].to_numpy(dtype=np.float64)
+    bounds = np.append(np.flatnonzero(timestamps[1:] != timestamps[:-1]) + 1, len(timestamps))
+
+    start = 0
+    for end in bounds:
+        market.now = pd.Timestamp(timestamps[start]).to_pydatetime()
+        market.prices.update(zip(tokens[start:end], prices[start:end]))
+
+        for trades in scheduler.pop_due():
+            for trade in trades:
+                try:
+                    await engine.append_sl_tgt(trade)
+                except (KeyError, TypeError) as e:
+                    logger.warning(f"Replay entry skipped for {trade.get('strategy_id')} at {market.now}: {e!r}")
+
+        subscribed = {token: market.prices[token] for token in set(tokens[start:end])
+                      if engine.tick_bus.subscribers(token)}
+        await engine._process_tick_batch(subscribed, market.now.strftime('%H:%M:%S'))
+        start = end
+
+
+def _replay_file(tick_file, strategies, contract_file, out_dir, journal_format):
+    processor = ContractProcessor(contract_file)
+    contract_df = asyncio.run(processor.process())
+    ticks = iter_ticks(tick_file)
+    name = os.path.splitext(os.path.basename(tick_file))[0]
+    journal = TradeJournal(path=os.path.join(out_dir, f'{name}_backtest.{journal_format}'), fmt=journal_format)
+    summary = asyncio.run(replay_day(ticks, strategies, contract_df, processor.index, journal=journal))
+    summary['file'] = tick_file
+    summary['journal'] = journal.path
+    return summary
+
+
+def run_backtest(tick_files, strategies, contract_file, workers=None, out_dir='backtest', journal_format='csv'):
+    """Replay each tick file (one trading day) in its own process; returns per-day summaries."""
+    os.makedirs(out_dir, exist_ok=True)
+    # Build the contract snapshot once so workers only memory-map it
+    asyncio.run(ContractProcessor(contract_file).process())
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_replay_file, path, strategies, contract_file, out_dir, journal_format)
+                   for path in tick_files]
+        return [future.result() for future in futures]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded ticks through the strategy engine.')
+    parser.add_argument('tick_files', nargs='+')
+    parser.add_argument('--contracts', required=True, help='NSE F&O contract CSV')
+    parser.add_argument('--config', default='config.ini')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out-dir', default='backtest')
+    parser.add_argument('--format', default='csv', choices=['csv', 'parquet', 'arrow'])
+    args = parser.parse_args()
+
+    summaries = run_backtest(args.tick_files, get_ini_details(args.config), args.contracts, args.workers,
+                             args.out_dir, args.format)
+    total = Counter()
+    for summary in summaries:
+        total.update(summary['pnl'])
+        print(f"{summary['day']}: {summary['legs']} legs, exits {summary['exits']}, P&L {summary['pnl']} "
+              f"-> {summary['journal']}")
+    print(f"Total P&L by strategy: {dict(total)}")
+
+
+if __name__ == '__main__':
+    main()
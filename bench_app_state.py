@@ -0,0 +1,61 @@
+"""
+Benchmark app-root-state extraction on saved scorecard pages.
+
+Usage: python bench_app_state.py page1.html [page2.html ...] [--repeat N]
+"""
+import json
+import sys
+import time
+
+from app_state import extract_app_root_state
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+
+def soup_path(html_text):
+    """The original CricketScorecard path: full html.parser tree, then replace."""
+    soup = BeautifulSoup(html_text, "html.parser")
+    script_tag = soup.find("script", id="app-root-state")
+    if not script_tag:
+        return None
+    return json.loads(script_tag.string.strip().replace('&q;', '"'))
+
+
+def time_it(func, arg, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        func(arg)
+    return (time.process_time() - start) / repeat
+
+
+def main(argv):
+    repeat = 20
+    if '--repeat' in argv:
+        i = argv.index('--repeat')
+        repeat = int(argv[i + 1])
+        del argv[i:i + 2]
+    if not argv:
+        print(__doc__.strip())
+        return 1
+
+    for path in argv:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        text = raw.decode('utf-8', errors='replace')
+
+        fast = time_it(extract_app_root_state, raw, repeat)
+        line = f"{path}: {len(raw) / 1024:.0f} KiB | scanner {fast * 1000:.2f} ms"
+        if BeautifulSoup is not None:
+            slow = time_it(soup_path, text, repeat)
+            line += f" | soup {slow * 1000:.2f} ms | speedup {slow / fast:.1f}x"
+        else:
+            line += " | soup n/a (bs4 not installed)"
+        print(line)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,89 @@
+"""
+Micro-benchmark match-card extraction on a fixture-list page.
+
+Usage: python bench_fixture_xpath.py [fixture.html] [--cards N] [--repeat N]
+Without a saved page, a synthetic one with --cards cards (default 300) is used.
+"""
+import sys
+import time
+
+from lxml import etree
+
+from main import FixtureStreamParser, MATCHES_XPATH, extract_match_card
+
+CARD = (
+    '<li class="match-card-container"><a class="match-card-wrapper" href="/scoreboard/A/B/{i}th-Match/1/2/x-vs-y/live">'
+    '<div class="team-info"><span class="team-name">Team {i}A</span><span class="team-score">{i}/3</span></div>'
+    '<div class="team-info"><span class="team-name">Team {i}B</span><span class="team-score">{i}/5</span></div>'
+    '<div class="result"><span>Team {i}A won by {i} runs</span></div></a></li>'
+)
+
+
+def synthetic_page(cards):
+    body = "".join(CARD.format(i=i) for i in range(cards))
+    return (f'<html><body><div class="days"><div class="date">Today</div>'
+            f'<div class="matches-card-space"><ul>{body}</ul></div></div></body></html>').encode()
+
+
+def string_xpath(html):
+    """The original path: six string XPath queries per card."""
+    matches = []
+    for match in etree.HTML(html).xpath(
+            "(//div[@class='date'])[1]/following-sibling::div[contains(@class, 'matches-card-space')]"
+            "//li[@class='match-card-container']"):
+        matches.append((
+            match.xpath(".//div[@class='team-info'][1]//span[@class='team-name']/text()"),
+            match.xpath(".//div[@class='team-info'][1]//span[@class='team-score']/text()"),
+            match.xpath(".//div[@class='team-info'][2]//span[@class='team-name']/text()"),
+            match.xpath(".//div[@class='team-info'][2]//span[@class='team-score']/text()"),
+            match.xpath(".//div[@class='result']//span/text() | .//div[@class='live-info']//span/text()"),
+            match.xpath(".//a[@class='match-card-wrapper']/@href"),
+        ))
+    return matches
+
+
+def single_pass(html):
+    return [extract_match_card(card) for card in MATCHES_XPATH(etree.HTML(html))]
+
+
+def streaming(html, chunk_size=64 * 1024):
+    parser = FixtureStreamParser()
+    matches = []
+    for i in range(0, len(html), chunk_size):
+        matches.extend(parser.feed(html[i:i + chunk_size]))
+    matches.extend(parser.close())
+    return matches
+
+
+def main(argv):
+    cards, repeat = 300, 20
+    for flag in ('--cards', '--repeat'):
+        if flag in argv:
+            i = argv.index(flag)
+            value = int(argv[i + 1])
+            del argv[i:i + 2]
+            if flag == '--cards':
+                cards = value
+            else:
+                repeat = value
+
+    if argv:
+        with open(argv[0], 'rb') as f:
+            html = f.read()
+        source = argv[0]
+    else:
+        html = synthetic_page(cards)
+        source = f"synthetic ({cards} cards)"
+
+    print(f"{source}: {len(html) / 1024:.0f} KiB, repeat {repeat}")
+    for name, func in (("string xpath", string_xpath), ("single pass", single_pass), ("streaming", streaming)):
+        start = time.process_time()
+        for _ in range(repeat):
+            found = func(html)
+        elapsed = (time.process_time() - start) / repeat
+        print(f"  {name:<13} {elapsed * 1000:8.2f} ms  ({len(found)} cards)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,359 @@
+"""
+Offline benchmark suite for the scraping backends.
+
+A local aiohttp stand-in server serves the recorded pages in fixtures/
+with configurable latency, and each backend is measured end to end:
+  lxml        MatchScraper fixture list (scrape_static_data)
+  json        CricketScorecard app-root-state pages
+  playwright  yyy.scrape_scorecards on the JS-rendered page (skipped if not installed)
+Reported per backend: throughput, p50/p99 request latency, parse CPU time
+and peak process RSS sampled during the pass, which includes libxml2's
+allocations; for playwright also the peak RSS of the browser processes.
+
+Usage:
+  python bench_scrapers.py [--requests N] [--latency MS] [--jitter MS] [--concurrency N] [--backends lxml,json]
+  python bench_scrapers.py --record fixture_list|scorecard|rendered URL   # save a real page as a fixture
+  python bench_scrapers.py --regenerate                                   # rebuild the synthetic fixtures
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+import aiohttp
+from aiohttp import web
+
+from main import MatchScraper, parse_fixture_list
+from temp import CricketScorecard
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+FIXTURES = {
+    'fixture_list': 'fixture_list.html',
+    'scorecard': 'scorecard.html',
+    'rendered': 'rendered.html',
+}
+HOST, PORT = '127.0.0.1', 8790
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def fixture_path(kind):
+    return os.path.join(FIXTURE_DIR, FIXTURES[kind])
+
+
+# --- fixtures ---------------------------------------------------------------
+
+def _filler(kb):
+    """Page chrome (nav, ads, footers) so fixtures have realistic size."""
+    block = '<div class="ad-slot"><a href="/news/{0}"><span>Related story {0}</span></a></div>'
+    return ''.join(block.format(i) for i in range(kb * 1024 // 70))
+
+
+def _fixture_list_html(cards=300):
+    rng = random.Random(7)
+    card = (
+        '<li class="match-card-container"><a class="match-card-wrapper" '
+        'href="/scoreboard/T7A/1R4/{i}th-Match/{a}/{b}/t{a}-vs-t{b}/scorecard">'
+        '<div class="team-info"><span class="team-name">Team {a}</span><span class="team-score">{s1}</span></div>'
+        '<div class="team-info"><span class="team-name">Team {b}</span><span class="team-score">{s2}</span></div>'
+        '<div class="{kind}"><span>{status}</span></div></a></li>'
+    )
+    body = []
+    for i in range(cards):
+        live = rng.random() < 0.2
+        body.append(card.format(
+            i=i, a=100 + 2 * i, b=101 + 2 * i,
+            s1=f'{rng.randint(80, 220)}/{rng.randint(0, 10)}', s2=f'{rng.randint(80, 220)}/{rng.randint(0, 10)}',
+            kind='live-info' if live else 'result',
+            status='Live' if live else f'Team {100 + 2 * i} won by {rng.randint(1, 90)} runs'))
+    return (f'<html><head><title>Fixtures</title></head><body>{_filler(40)}<div class="days">'
+            f'<div class="date">Today</div><div class="matches-card-space"><ul>{"".join(body)}</ul></div>'
+            f'<div class="date">Tomorrow</div></div>{_filler(20)}</body></html>')
+
+
+def _scorecard_state(rng):
+    players = [{"f_key": str(1000 + i), "n": f"Player {1000 + i}"} for i in range(22)]
+    innings = []
+    for team, offset in (("122", 0), ("123", 11)):
+        batting = [f"{1000 + offset + i}.{rng.randint(0, 90)}.{rng.randint(1, 60)}.{rng.randint(0, 8)}."
+                   f"{rng.randint(0, 5)}" for i in range(9)] + [f"{1000 + offset + 9}.-", f"{1000 + offset + 10}.-"]
+        bowling = [f"{1000 + 11 - offset + i}.{rng.randint(10, 50)}.{rng.randint(12, 24)}.{rng.randint(0, 1)}."
+                   f"{rng.randint(0, 4)}" for i in range(5)]
+        innings.append({"c": team, "d": f"{rng.randint(120, 220)}/{rng.randint(2, 9)}(120", "b": batting,
+                        "a": bowling})
+    return {
+        "https://oc.crickapi.com/mapping/getHomeMapData": {
+            "p": players,
+            "t": [{"f_key": "122", "n": "Hornchurch", "sn": "HOR"}, {"f_key": "123", "n": "Byron", "sn": "BYR"}],
+        },
+        "https://api-v1.com/w/sC4.php": innings,
+    }
+
+
+def _scorecard_html():
+    state = json.dumps(_scorecard_state(random.Random(11)))
+    for char, entity in (('&', '&a;'), ('"', '&q;'), ("'", '&s;'), ('<', '&l;'), ('>', '&g;')):
+        state = state.replace(char, entity)
+    return (f'<html><head><title>Scorecard</title></head><body>{_filler(300)}'
+            f'<script id="app-root-state" type="application/json">{state}</script></body></html>')
+
+
+def _rendered_html():
+    """Tables only exist after the inline script runs, like the live JS-rendered page."""
+    state = json.dumps(_scorecard_state(random.Random(11)))
+    return f'''<html><body>{_filler(60)}<div id="root"></div><script>
+const state = {state};
+const names = Object.fromEntries(state["https://oc.crickapi.com/mapping/getHomeMapData"].p.map(p => [p.f_key, p.n]));
+const table = (rows, cls) => `<table class="${{cls}}"><tr><th>Name</th></tr>` + rows.map(r => r.split("."))
+    .filter(s => s.length >= 5).map(s => `<tr>${{[names[s[0]], ...s.slice(1, 5)].map(c => `<td>${{c}}</td>`).join("")}}</tr>`)
+    .join("") + "</table>";
+setTimeout(() => {{
+  document.getElementById("root").innerHTML = '<div class="scorecard-container">' +
+    state["https://api-v1.com/w/sC4.php"].map((inn, i) =>
+      `<div class="innings-${{i + 1}}">` + table(inn.b, "batting-table") + table(inn.a, "bowling-table") + "</div>")
+    .join("") + "</div>";
+}}, 50);
+</script></body></html>'''
+
+
+def regenerate():
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for kind, build in (('fixture_list', _fixture_list_html), ('scorecard', _scorecard_html),
+                        ('rendered', _rendered_html)):
+        with open(fixture_path(kind), 'w', encoding='utf-8') as f:
+            f.write(build())
+        print(f"wrote {fixture_path(kind)} ({os.path.getsize(fixture_path(kind)) / 1024:.0f} KiB)")
+
+
+async def record(kind, url):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as response:
+            body = await response.read()
+    with open(fixture_path(kind), 'wb') as f:
+        f.write(body)
+    print(f"recorded {url} -> {fixture_path(kind)} ({len(body) / 1024:.0f} KiB)")
+
+
+# --- stand-in server --------------------------------------------------------
+
+async def start_server(latency_ms=0.0, jitter_ms=0.0):
+    pages = {}
+    for kind in FIXTURES:
+        with open(fixture_path(kind), 'rb') as f:
+            pages[kind] = f.read()
+
+    def handler(kind):
+        async def handle(request):
+            delay = latency_ms + random.uniform(0, jitter_ms)
+            if delay:
+                await asyncio.sleep(delay / 1000)
+            return web.Response(body=pages[kind], content_type='text/html')
+        return handle
+
+    app = web.Application()
+    app.router.add_get('/fixtures/match-list', handler('fixture_list'))
+    app.router.add_get('/scoreboard/{path:.*}', handler('scorecard'))
+    app.router.add_get('/rendered/{path:.*}', handler('rendered'))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+    return runner
+
+
+# --- measurement ------------------------------------------------------------
+
+def _rss_bytes(pid='self'):
+    """Resident set size of a process from /proc, or None where unavailable."""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _child_pids(pid):
+    """All descendants of pid (Linux /proc), e.g. the Playwright driver and Chromium."""
+    children = []
+    try:
+        for task in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{task}/children') as f:
+                children.extend(int(c) for c in f.read().split())
+    except OSError:
+        return []
+    return children + [p for child in children for p in _child_pids(child)]
+
+
+class RSSSampler:
+    """
+    Samples this process's RSS, and the summed RSS of its child processes,
+    from a thread during a pass. A thread keeps sampling while synchronous
+    parsing blocks the event loop. Without /proc, falls back to
+    getrusage's lifetime peak and leaves the children unmeasured.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = 0
+        self.children_peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        if self.peak == 0 and resource is not None:
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.peak = maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+    def _run(self):
+        pid = os.getpid()
+        while True:
+            rss = _rss_bytes()
+            if rss is None:
+                return
+            self.peak = max(self.peak, rss)
+            sizes = [_rss_bytes(child) for child in _child_pids(pid)]
+            sizes = [size for size in sizes if size is not None]
+            if sizes:
+                self.children_peak = max(self.children_peak or 0, sum(sizes))
+            if self._stop.wait(self.interval):
+                return
+
+
+class Measurement:
+    def __init__(self, backend):
+        self.backend = backend
+        self.latencies = []
+        self.parse_cpu = 0.0
+        self.wall = 0.0
+        self.peak_rss = 0
+        self.children_rss = None
+
+    def report(self):
+        if not self.latencies:
+            return f"{self.backend:<11} no requests"
+        latencies = sorted(self.latencies)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        parse = f"{self.parse_cpu * 1000:8.1f} ms" if self.parse_cpu is not None else "     n/a   "
+        line = (f"{self.backend:<11} {len(latencies):5d} req  {len(latencies) / self.wall:8.1f} req/s  "
+                f"p50 {statistics.median(latencies) * 1000:7.1f} ms  p99 {p99 * 1000:7.1f} ms  "
+                f"parse CPU {parse}  peak RSS {self.peak_rss / 1024 / 1024:6.1f} MiB")
+        if self.children_rss is not None:
+            line += f" + browsers {self.children_rss / 1024 / 1024:6.1f} MiB"
+        return line
+
+
+async def measure(backend, run_one, requests, concurrency):
+    result = Measurement(backend)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await run_one(i, result)
+            result.latencies.append(time.perf_counter() - start)
+
+    with RSSSampler() as rss:
+        start = time.perf_counter()
+        await asyncio.gather(*(timed(i) for i in range(requests)))
+        result.wall = time.perf_counter() - start
+    result.peak_rss = rss.peak
+    result.children_rss = rss.children_peak
+    return result
+
+
+async def bench_lxml(requests, concurrency):
+    async with MatchScraper(max_concurrency=concurrency) as scraper:
+        url = f'http://{HOST}:{PORT}/fixtures/match-list'
+
+        async def run_one(i, result):
+            html = await scraper.fetch_html(url)
+            cpu = time.process_time()
+            parse_fixture_list(html)
+            result.parse_cpu += time.process_time() - cpu
+
+        return await measure('lxml', run_one, requests, concurrency)
+
+
+async def bench_json(requests, concurrency):
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def run_one(i, result):
+            url = f'http://{HOST}:{PORT}/scoreboard/T7A/1R4/{i}th-Match/122/123/x-vs-y/scorecard'
+            async with session.get(url) as response:
+                html = await response.read()
+            cpu = time.process_time()
+            CricketScorecard(url, html=html).to_record()
+            result.parse_cpu += time.process_time() - cpu
+
+        return await measure('json', run_one, requests, concurrency)
+
+
+async def bench_playwright(requests, concurrency):
+    try:
+        from yyy import BrowserPool, scrape_scorecard
+    except ImportError:
+        print("playwright    skipped (not installed)")
+        return None
+
+    async with BrowserPool(size=max(1, concurrency // 4), pages_per_browser=4) as pool:
+        async def run_one(i, result):
+            await scrape_scorecard(pool, f'http://{HOST}:{PORT}/rendered/{i}')
+
+        result = await measure('playwright', run_one, requests, concurrency)
+    result.parse_cpu = None  # parsing happens inside the browser
+    return result
+
+
+BENCHES = {'lxml': bench_lxml, 'json': bench_json, 'playwright': bench_playwright}
+
+
+async def run(args):
+    runner = await start_server(args.latency, args.jitter)
+    try:
+        print(f"stand-in server on {HOST}:{PORT}, latency {args.latency} ms (+{args.jitter} jitter), "
+              f"{args.requests} requests, concurrency {args.concurrency}")
+        for backend in args.backends.split(','):
+            requests = args.requests if backend != 'playwright' else min(args.requests, 50)
+            result = await BENCHES[backend](requests, args.concurrency)
+            if result is not None:
+                print(result.report())
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark scraping backends against local fixtures.')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=20.0, help='server latency in ms')
+    parser.add_argument('--jitter', type=float, default=10.0, help='extra random latency in ms')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--backends', default='lxml,json,playwright')
+    parser.add_argument('--record', nargs=2, metavar=('KIND', 'URL'))
+    parser.add_argument('--regenerate', action='store_true')
+    args = parser.parse_args()
+
+    if args.regenerate:
+        regenerate()
+    elif args.record:
+        asyncio.run(record(*args.record))
+    else:
+        asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
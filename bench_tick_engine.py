@@ -0,0 +1,88 @@
+"""
+Benchmark the event-driven trade tracker against a simulated tick feed.
+
+--feed push publishes random ticks straight onto the tick bus; --feed poll
+runs the live polling path instead (PollingTickSource -> QuoteCache ->
+SimulatedAdapter) and reports upstream quote calls.
+
+Usage: python bench_tick_engine.py [--legs N] [--tokens N] [--seconds S] [--ticks-per-round N] [--feed push|poll] [--latency]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from latency import LatencyRecorder, monitor_loop_lag
+from market_data import QuoteCache, SimulatedAdapter
+from testing import ContractIndex, StopLossTarget
+from tick_engine import PollingTickSource, SimulatedTickFeed
+
+
+def empty_index():
+    return ContractIndex(pd.DataFrame({
+        'FinInstrmId': pd.Series(dtype='int64'), 'TckrSymb': pd.Series(dtype='str'),
+        'XpryDt': pd.Series(dtype='datetime64[ns]'), 'StrkPric': pd.Series(dtype='float64'),
+        'OptnTp': pd.Series(dtype='str'),
+    }))
+
+
+async def run(legs, tokens, seconds, ticks_per_round, feed_kind='push', latency=False):
+    recorder = LatencyRecorder() if latency else None
+    adapter = SimulatedAdapter(option_price=100.0, seed=1)
+    engine = StopLossTarget(None, contract_index=empty_index(), latency=recorder, market_data=QuoteCache(adapter))
+    exit_time = (datetime.now() + timedelta(seconds=seconds)).strftime('%H:%M:%S')
+    prices = {str(40000 + i): 100.0 for i in range(tokens)}
+    for i in range(legs):
+        token = str(40000 + i % tokens)
+        # Wide SL/target so legs stay open and every tick is evaluated
+        engine._open_trade({'token': token, 'entry_price': 100.0, 'stoploss': 1e9, 'target': -1.0,
+                            'exit_time': exit_time, 'strategy_id': 'bench', 'trade_number': i, 'type': 'Normal'})
+    engine.finish_entries()
+
+    if feed_kind == 'poll':
+        feed = PollingTickSource(engine.tick_bus, engine.fetch_prices)
+    else:
+        feed = SimulatedTickFeed(engine.tick_bus, prices, ticks_per_round=ticks_per_round, seed=1)
+    stop_event = asyncio.Event()
+    feed_task = asyncio.create_task(feed.run(stop_event))
+    lag_task = asyncio.create_task(monitor_loop_lag(recorder, stop_event)) if latency else None
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    await engine.track_live_trade()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    stop_event.set()
+    await feed_task
+    if lag_task is not None:
+        await lag_task
+
+    print(f"{legs} legs on {tokens} tokens for {wall:.1f}s: {feed.published} ticks published "
+          f"({feed.published / wall:,.0f}/s), {legs - len(engine.trades)} legs closed, "
+          f"CPU {cpu:.2f}s ({cpu / wall:.0%} of one core)")
+    if feed_kind == 'poll':
+        print(f"  upstream: {adapter.calls} quote calls for {adapter.tokens_requested} tokens, "
+              f"quote cache {engine.market_data.stats()}")
+    if latency:
+        for name, summary in recorder.snapshot().items():
+            print(f"  {name:<18} n={summary['count']:<7} p50 {summary['p50_ms']:.3f} ms  "
+                  f"p99 {summary['p99_ms']:.3f} ms  p99.9 {summary['p99.9_ms']:.3f} ms  max {summary['max_ms']:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--legs', type=int, default=500)
+    parser.add_argument('--tokens', type=int, default=100)
+    parser.add_argument('--seconds', type=int, default=5)
+    parser.add_argument('--ticks-per-round', type=int, default=10)
+    parser.add_argument('--feed', choices=['push', 'poll'], default='push')
+    parser.add_argument('--latency', action='store_true', help='record and print hot-path latency histograms')
+    args = parser.parse_args()
+    os.chdir(tempfile.mkdtemp())  # keep the trade journal out of the working tree
+    asyncio.run(run(args.legs, args.tokens, args.seconds, args.ticks_per_round, args.feed, args.latency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+import hashlib
+import sqlite3
+import time
+import zlib
+
+# TTL (seconds) by match state; None means never expires
+LIVE_TTL = 15
+UPCOMING_TTL = 10 * 60
+DEFAULT_TTL = 60
+LIVE_STATUSES = ('live', 'rain delay', 'stumps', 'innings break', 'lunch', 'tea', 'drinks', 'strategic timeout')
+UPCOMING_STATUSES = ('not started', 'upcoming')
+# Substrings that only appear once a match has a final result
+COMPLETED_MARKERS = ('completed', 'won by', 'won on', 'drawn', 'draw', 'abandoned', 'no result', 'tied', 'cancelled')
+
+
+def is_completed(status):
+    """True only for statuses that clearly describe a final result."""
+    if not status:
+        return False
+    status = status.strip().lower()
+    return 'toss' not in status and any(marker in status for marker in COMPLETED_MARKERS)
+
+
+def ttl_for_status(status):
+    """
+    Completed results are cached forever, live pages for seconds, upcoming
+    ones for minutes. Anything unrecognised (delays, start times) gets the
+    short default so an unfinished match is never frozen in the cache.
+    """
+    if is_completed(status):
+        return None
+    status = (status or '').strip().lower()
+    if status in LIVE_STATUSES:
+        return LIVE_TTL
+    if status in UPCOMING_STATUSES:
+        return UPCOMING_TTL
+    return DEFAULT_TTL
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk response cache keyed by URL.
+    Bodies are zlib-compressed and stored once per content hash in SQLite;
+    least recently used entries are evicted past max_bytes. A running byte
+    total and an index on entries(hash) keep each put independent of the
+    cache size.
+    """
+
+    def __init__(self, path='.http_cache.sqlite', max_bytes=512 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                hash TEXT NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+            CREATE INDEX IF NOT EXISTS entries_hash ON entries (hash);
+        """)
+        with self._conn:
+            # Blobs orphaned by an older version or an interrupted run
+            self._conn.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT hash FROM entries)")
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def get(self, url):
+        """Return the cached body as bytes, or None on a miss or expired entry."""
+        now = time.time()
+        row = self._conn.execute(
+            "SELECT e.expires_at, b.data, e.hash FROM entries e JOIN blobs b ON b.hash = e.hash WHERE e.url = ?",
+            (url,),
+        ).fetchone()
+        if row is None or (row[0] is not None and row[0] <= now):
+            if row is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+                    self._drop_blob_if_unused(row[2])
+            self.misses += 1
+            return None
+
+        with self._conn:
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE url = ?", (now, url))
+        self.hits += 1
+        return zlib.decompress(row[1])
+
+    def put(self, url, body, ttl=DEFAULT_TTL):
+        """Store body (bytes or str) for url; ttl=None keeps it until evicted."""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+
+        with self._conn:
+            previous = self._conn.execute("SELECT hash FROM entries WHERE url = ?", (url,)).fetchone()
+            exists = self._conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone()
+            if not exists:
+                data = zlib.compress(body, 6)
+                self._conn.execute("INSERT INTO blobs (hash, data, size) VALUES (?, ?, ?)",
+                                   (digest, data, len(data)))
+                self._bytes += len(data)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (url, hash, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (url, digest, expires_at, now),
+            )
+            if previous is not None and previous[0] != digest:
+                self._drop_blob_if_unused(previous[0])
+        self._evict()
+
+    def _drop_blob_if_unused(self, digest):
+        """Delete one blob once no entry points at it (call inside a transaction)."""
+        if self._conn.execute("SELECT 1 FROM entries WHERE hash = ? LIMIT 1", (digest,)).fetchone():
+            return
+        row = self._conn.execute("SELECT size FROM blobs WHERE hash = ?", (digest,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM blobs WHERE hash = ?", (digest,))
+            self._bytes -= row[0]
+
+    def _evict(self):
+        """Drop least recently used entries, and the blobs only they used, until under max_bytes."""
+        if self._bytes <= self.max_bytes:
+            return
+        with self._conn:
+            while self._bytes > self.max_bytes:
+                oldest = self._conn.execute(
+                    "SELECT url, hash FROM entries ORDER BY last_access LIMIT 1").fetchone()
+                if oldest is None:
+                    break
+                self._conn.execute("DELETE FROM entries WHERE url = ?", (oldest[0],))
+                self._drop_blob_if_unused(oldest[1])
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0],
+            "bytes": self._bytes,
+        }
+
+    def close(self):
+        self._conn.close()
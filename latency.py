@@ -0,0 +1,216 @@
+import asyncio
+import functools
+import os
+import time
+
+from local_http import LocalHTTPServer
+
+SUB_BUCKET_BITS = 5  # 32 linear sub-buckets per power of two: values within ~3%
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_TRACKED_NS = 1 << 40  # ~18 minutes; larger values land in the top bucket
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def _bucket_index(value):
+    if value < 2 * SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+
+
+def _bucket_upper(index):
+    """Largest value that falls in the bucket."""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    return ((SUB_BUCKETS + index % SUB_BUCKETS + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of nanosecond durations: log-linear buckets with a
+    fixed relative error, so recording is an index computation and a list
+    increment, and memory stays constant however many samples arrive.
+    """
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (_bucket_index(MAX_TRACKED_NS) + 1)
+        self.reset()
+
+    def reset(self):
+        self.counts[:] = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, value_ns):
+        value_ns = min(max(int(value_ns), 0), MAX_TRACKED_NS)
+        self.counts[_bucket_index(value_ns)] += 1
+        self.count += 1
+        self.total += value_ns
+        if value_ns > self.max:
+            self.max = value_ns
+        if self.min is None or value_ns < self.min:
+            self.min = value_ns
+
+    def percentile(self, q):
+        """Value in ns at quantile q (0..1), reported as its bucket's upper bound."""
+        if not self.count:
+            return 0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(_bucket_upper(index), self.max)
+        return self.max
+
+    def snapshot(self):
+        """Summary in milliseconds."""
+        summary = {'count': self.count,
+                   'mean_ms': self.total / self.count / 1e6 if self.count else 0.0,
+                   'max_ms': self.max / 1e6}
+        for q in QUANTILES:
+            summary[f'p{q * 100:g}_ms'] = self.percentile(q) / 1e6
+        return summary
+
+
+class LatencyRecorder:
+    """
+    Named histograms for the trading loop. record() and timed() are the
+    only hot-path calls; a disabled recorder (NULL_RECORDER) is never
+    wired in, so switching instrumentation off costs nothing.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.histograms = {}
+        self.started_at = time.time()
+
+    def histogram(self, name):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = LatencyHistogram()
+        return hist
+
+    def record(self, name, value_ns):
+        self.histogram(name).record(value_ns)
+
+    def timed(self, name, func):
+        """Wrap a function or coroutine function so each call records its duration."""
+        hist = self.histogram(name)
+        clock = time.perf_counter_ns
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = clock()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    hist.record(clock() - start)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                hist.record(clock() - start)
+        return wrapper
+
+    def instrument(self, obj, methods):
+        """Replace obj's bound methods ({method name: histogram name}) with timed versions."""
+        for method, name in methods.items():
+            setattr(obj, method, self.timed(name, getattr(obj, method)))
+
+    def snapshot(self):
+        return {name: hist.snapshot() for name, hist in sorted(self.histograms.items())}
+
+    def prometheus_text(self, prefix='trading'):
+        """Histograms as Prometheus summaries (seconds) in the text exposition format."""
+        lines = []
+        for name, hist in sorted(self.histograms.items()):
+            metric = f'{prefix}_{name}_seconds'
+            lines.append(f'# TYPE {metric} summary')
+            for q in QUANTILES:
+                lines.append(f'{metric}{{quantile="{q:g}"}} {hist.percentile(q) / 1e9:.9f}')
+            lines.append(f'{metric}_sum {hist.total / 1e9:.9f}')
+            lines.append(f'{metric}_count {hist.count}')
+            lines.append(f'{prefix}_{name}_max_seconds {hist.max / 1e9:.9f}')
+        return '\n'.join(lines) + '\n'
+
+
+class _NullRecorder:
+    """Instrumentation switched off."""
+
+    enabled = False
+    histograms = {}
+
+    def record(self, name, value_ns):
+        pass
+
+    def timed(self, name, func):
+        return func
+
+    def instrument(self, obj, methods):
+        pass
+
+    def snapshot(self):
+        return {}
+
+    def prometheus_text(self, prefix='trading'):
+        return ''
+
+
+NULL_RECORDER = _NullRecorder()
+
+
+async def monitor_loop_lag(recorder, stop_event, interval=0.05, name='event_loop_lag'):
+    """Sample event-loop lag: how late a sleep(interval) wakes up."""
+    hist = recorder.histogram(name)
+    clock = time.perf_counter_ns
+    interval_ns = int(interval * 1e9)
+    while not stop_event.is_set():
+        start = clock()
+        await asyncio.sleep(interval)
+        hist.record(clock() - start - interval_ns)
+
+
+async def export_periodically(recorder, stop_event, path, interval=10.0):
+    """
+    Rewrite path with the Prometheus text every interval (and once on stop).
+    The file is replaced atomically, so it suits node_exporter's textfile
+    collector or a tail -f.
+    """
+    def write():
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            f.write(recorder.prometheus_text())
+        os.replace(tmp, path)
+
+    while not stop_event.is_set():
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        await asyncio.to_thread(write)
+
+
+class MetricsServer(LocalHTTPServer):
+    """Local HTTP endpoint serving the recorder as Prometheus text on GET /metrics."""
+
+    paths = ('/', '/metrics')
+    content_type = 'text/plain; version=0.0.4'
+
+    def __init__(self, recorder, host='127.0.0.1', port=9108):
+        super().__init__(host, port)
+        self.recorder = recorder
+
+    def body(self):
+        return self.recorder.prometheus_text().encode()
@@ -0,0 +1,49 @@
+import asyncio
+from abc import ABC, abstractmethod
+
+
+class LocalHTTPServer(ABC):
+    """
+    Minimal local HTTP endpoint for one GET resource. Subclasses set paths,
+    content_type and not_found, and implement body() returning bytes.
+    """
+
+    paths = ('/',)
+    content_type = 'text/plain'
+    not_found = b'not found\n'
+
+    def __init__(self, host='127.0.0.1', port=8765):
+        self.host = host
+        self.port = port
+        self._server = None
+
+    @abstractmethod
+    def body(self):
+        """Response body for a GET on one of paths, as bytes."""
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass  # headers are not needed
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] in self.paths:
+                status, body = '200 OK', self.body()
+            else:
+                status, body = '404 Not Found', self.not_found
+            writer.write(f'HTTP/1.1 {status}\r\nContent-Type: {self.content_type}\r\n'
+                         f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode() + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
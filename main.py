@@ -1,15 +1,205 @@
 # noinspection PyCompatibility
 import asyncio
+import hashlib
+import inspect
+import sys
+import time
+
 import aiohttp
 from lxml import etree
 
+from app_state import find_app_root_state
+from http_cache import ResponseCache, ttl_for_status
+from temp import CricketScorecard
+
+
+# Base poll interval (seconds) per live status; unchanged pages back off up to the max
+LIVE_POLL_INTERVALS = {'live': 10.0, 'rain delay': 120.0}
+MAX_POLL_INTERVAL = 300.0
+POLL_BACKOFF = 1.5
+
+# Match containers under today's date, compiled once
+MATCHES_XPATH = etree.XPath(
+    "(//div[@class='date'])[1]/following-sibling::div[contains(@class, 'matches-card-space')]"
+    "//li[@class='match-card-container']"
+)
+STATUS_CLASSES = ('result', 'live-info')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _first_text(element):
+    """First text node inside an element, matching XPath's span/text()[1]."""
+    if element.text is not None:
+        return element.text
+    return next((child.tail for child in element if child.tail is not None), None)
+
+
+def extract_match_card(card):
+    """Pull every field of one match card in a single walk over its subtree."""
+    names = [None, None]
+    scores = [None, None]
+    status = href = None
+    team_index = -1
+    in_team = in_status = 0
+
+    for event, element in etree.iterwalk(card, events=('start', 'end')):
+        tag = element.tag
+        if not isinstance(tag, str):  # comments, processing instructions
+            continue
+        css_class = element.get('class')
+        if event == 'end':
+            if tag == 'div':
+                if css_class == 'team-info':
+                    in_team -= 1
+                elif css_class in STATUS_CLASSES:
+                    in_status -= 1
+            continue
+
+        if tag == 'div':
+            if css_class == 'team-info':
+                team_index += 1
+                in_team += 1
+            elif css_class in STATUS_CLASSES:
+                in_status += 1
+        elif tag == 'span':
+            text = _first_text(element)
+            if text is None:
+                continue
+            if in_team and team_index < 2:
+                if css_class == 'team-name' and names[team_index] is None:
+                    names[team_index] = text
+                elif css_class == 'team-score' and scores[team_index] is None:
+                    scores[team_index] = text
+            if in_status and status is None:
+                status = text
+        elif tag == 'a' and css_class == 'match-card-wrapper' and href is None:
+            href = element.get('href')
+
+    return {
+        "team1": names[0] if names[0] is not None else "Unknown",
+        "team1_score": scores[0] if scores[0] is not None else "Yet to bat",
+        "team2": names[1] if names[1] is not None else "Unknown",
+        "team2_score": scores[1] if scores[1] is not None else "Yet to bat",
+        "status": status if status is not None else "Not Started",
+        "link": f"https://crex.live{href}" if href is not None else "N/A",
+    }
+
+
+def parse_fixture_list(html):
+    """Parse a whole fixture-list page into match dicts."""
+    return [extract_match_card(card) for card in MATCHES_XPATH(etree.HTML(html))]
+
+
+class FixtureStreamParser:
+    """
+    Incremental fixture-list parser for very large pages.
+    Feed chunks as they arrive; each completed match card is extracted
+    and then dropped, so the full tree is never held in memory.
+    """
+
+    def __init__(self):
+        self._parser = etree.HTMLPullParser(events=('start', 'end'))
+        self._date_parent = None  # parent of the first div.date
+        self._card_space = None  # matches-card-space sibling currently open
+
+    def feed(self, data):
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self):
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self):
+        matches = []
+        for event, element in self._parser.read_events():
+            tag = element.tag
+            if event == 'start':
+                if tag != 'div':
+                    continue
+                css_class = element.get('class', '')
+                if css_class == 'date' and self._date_parent is None:
+                    self._date_parent = element.getparent()
+                elif (self._date_parent is not None and self._card_space is None
+                      and 'matches-card-space' in css_class and element.getparent() is self._date_parent):
+                    self._card_space = element
+            elif element is self._card_space:
+                self._card_space = None
+                element.clear()
+            elif tag == 'li' and self._card_space is not None and element.get('class') == 'match-card-container':
+                matches.append(extract_match_card(element))
+                # Free the finished card and any earlier siblings
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+        return matches
+
 
 # noinspection PyCompatibility
 class MatchScraper:
-    def __init__(self):
+    def __init__(self, max_concurrency=16, limit_per_host=8, keepalive_timeout=30, request_timeout=30, cache=None,
+                 on_live_update=None):
+        """
+        on_live_update(href, scorecard) is called (and awaited if it returns
+        an awaitable) whenever a polled live match's data changes; pass e.g.
+        an asyncio.Queue's put_nowait to consume updates elsewhere.
+        """
         self.base_url = 'https://crex.live/fixtures/match-list'
         self.match_list = []
 
+        # Optional on-disk ResponseCache shared with the other scrapers
+        self.cache = cache
+
+        # Pool settings for the shared session
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self.session = None
+        self.semaphore = None
+
+        # Per-request timing: {"url", "status", "elapsed"}
+        self.fetch_timings = []
+
+        # Live polling state per match link: validators, content hash and schedule
+        self.poll_state = {}
+        self.poll_stats = {"requests": 0, "not_modified": 0, "unchanged": 0, "parsed": 0, "errors": 0}
+        self.on_live_update = on_live_update
+
+        # Latest parsed CricketScorecard per match link
+        self.scorecards = {}
+
+    async def __aenter__(self):
+        await self.open_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close_session()
+
+    async def open_session(self):
+        """
+        Create the long-lived pooled session shared by every fetch.
+        Connections are kept alive and reused across match pages.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            )
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.session
+
+    async def close_session(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
     async def scrape_match(self, match):
         """
         Main match scraping controller.
@@ -17,72 +207,280 @@ class MatchScraper:
         """
         print(f"Scraping match: {match}")
 
-    async def fetch_html(self, session, url):
-        async with session.get(url) as response:
-            return await response.text()
+    async def _request(self, url, headers=None):
+        """
+        GET a page on the shared session, bounded by the concurrency cap.
+        Returns (status, text, response headers); text is None on 304 or error.
+        """
+        session = await self.open_session()
+        async with self.semaphore:
+            start = time.perf_counter()
+            status = None
+            try:
+                async with session.get(url, headers=headers) as response:
+                    status = response.status
+                    if status == 304:
+                        return status, None, response.headers
+                    return status, await response.text(), response.headers
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"Error fetching {url}: {e}", file=sys.stderr)
+                return status, None, {}
+            finally:
+                self.fetch_timings.append({
+                    "url": url,
+                    "status": status,
+                    "elapsed": time.perf_counter() - start,
+                })
 
-    async def scrape_static_data(self):
-        async with aiohttp.ClientSession() as session:
-            html = await self.fetch_html(session, self.base_url)
-            if html:
-                tree = etree.HTML(html)
+    async def fetch_html(self, url, status=None):
+        """
+        Fetch a page on the shared session, bounded by the concurrency cap.
+        With a cache, the match status decides how long the page stays fresh.
+        """
+        if self.cache is not None:
+            body = self.cache.get(url)
+            if body is not None:
+                return body.decode('utf-8')
 
-                # XPath to find match containers under today's date
-                matches_xpath = "(//div[@class='date'])[1]/following-sibling::div[contains(@class, 'matches-card-space')]//li[@class='match-card-container']"
-                match_elements = tree.xpath(matches_xpath)
+        response_status, html, _ = await self._request(url)
+        if self.cache is not None and html and response_status == 200:
+            self.cache.put(url, html, ttl_for_status(status))
+        return html
 
-                for match in match_elements:
-                    team1_name = match.xpath(".//div[@class='team-info'][1]//span[@class='team-name']/text()")
-                    team1_score = match.xpath(".//div[@class='team-info'][1]//span[@class='team-score']/text()")
+    async def scrape_static_data(self, streaming=False):
+        """
+        Scrape today's match cards from the fixture list.
+        streaming=True parses the page chunk by chunk as it downloads
+        instead of building the whole tree (bypasses the cache).
+        """
+        if streaming:
+            match_list = await self._stream_fixture_list()
+        else:
+            # The fixture list carries live scores, so it is cached like a live page
+            html = await self.fetch_html(self.base_url, status='live')
+            match_list = parse_fixture_list(html) if html else None
+
+        if match_list is not None:
+            self.match_list = match_list
 
-                    team2_name = match.xpath(".//div[@class='team-info'][2]//span[@class='team-name']/text()")
-                    team2_score = match.xpath(".//div[@class='team-info'][2]//span[@class='team-score']/text()")
+    async def _stream_fixture_list(self):
+        session = await self.open_session()
+        parser = FixtureStreamParser()
+        match_list = []
+        async with self.semaphore:
+            start = time.perf_counter()
+            status = None
+            try:
+                async with session.get(self.base_url) as response:
+                    status = response.status
+                    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                        match_list.extend(parser.feed(chunk))
+                match_list.extend(parser.close())
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"Error fetching {self.base_url}: {e}", file=sys.stderr)
+                return None
+            finally:
+                self.fetch_timings.append({
+                    "url": self.base_url,
+                    "status": status,
+                    "elapsed": time.perf_counter() - start,
+                })
+        return match_list
 
-                    match_status = match.xpath(
-                        ".//div[@class='result']//span/text() | .//div[@class='live-info']//span/text()"
-                    )
-                    match_href = match.xpath(".//a[@class='match-card-wrapper']/@href")
+    def _sync_live_schedule(self, now):
+        """Track matches that are live or rain-delayed and drop ones that are not."""
+        live = {}
+        for match in self.match_list:
+            match_status = match["status"].strip().lower()
+            if match_status in LIVE_POLL_INTERVALS and match["link"] != "N/A":
+                live[match["link"]] = match_status
 
-                    match_dict = {
-                        "team1": team1_name[0] if team1_name else "Unknown",
-                        "team1_score": team1_score[0] if team1_score else "Yet to bat",
-                        "team2": team2_name[0] if team2_name else "Unknown",
-                        "team2_score": team2_score[0] if team2_score else "Yet to bat",
-                        "status": match_status[0] if match_status else "Not Started",
-                        "link": f"https://crex.live{match_href[0]}" if match_href else "N/A",
-                    }
+        for href in list(self.poll_state):
+            if href not in live:
+                del self.poll_state[href]
 
-                    self.match_list.append(match_dict)
+        for href, match_status in live.items():
+            state = self.poll_state.get(href)
+            if state is None:
+                self.poll_state[href] = self._new_poll_state(match_status, now)
+            elif state["status"] != match_status:
+                # Status flipped (e.g. rain delay -> live): poll again straight away
+                state["status"] = match_status
+                state["interval"] = LIVE_POLL_INTERVALS[match_status]
+                state["next_poll"] = now
+
+    @staticmethod
+    def _new_poll_state(match_status, now):
+        return {
+            "status": match_status,
+            "etag": None,
+            "last_modified": None,
+            "content_hash": None,
+            "interval": LIVE_POLL_INTERVALS[match_status],
+            "next_poll": now,
+        }
 
     async def scrape_live_data(self, href_of_the_match):
-        pass
+        """
+        Poll one live match page once.
+        Sends conditional headers when the server gave validators and skips
+        parsing when the match data on the page hashes the same as last time.
+        Changed pages are parsed into self.scorecards and passed to
+        on_live_update. Returns True when the page changed and was parsed.
+        """
+        loop = asyncio.get_running_loop()
+        state = self.poll_state.get(href_of_the_match)
+        if state is None:
+            state = self.poll_state[href_of_the_match] = self._new_poll_state('live', loop.time())
 
-    def extract_scorecard(self, html_content):
-        pass
+        headers = {}
+        if state["etag"]:
+            headers["If-None-Match"] = state["etag"]
+        if state["last_modified"]:
+            headers["If-Modified-Since"] = state["last_modified"]
 
-    async def scrape_completed_matches(self):
-        for match in self.match_list:
-            match_status = match["status"].strip().lower()
-            href_of_match = match["link"]
-            async with aiohttp.ClientSession() as session:
-                html = await self.fetch_html(session, href_of_match)
-                if html:
-                    if match_status not in ('live', 'rain delay'):
-                        self.extract_scorecard(html)
-                    elif match_status == 'live':
-                        await self.scrape_live_data(href_of_match)
+        status, html, response_headers = await self._request(href_of_the_match, headers=headers)
+        self.poll_stats["requests"] += 1
+
+        changed = False
+        if status == 304:
+            self.poll_stats["not_modified"] += 1
+        elif status == 200 and html:
+            state["etag"] = response_headers.get("ETag", state["etag"])
+            state["last_modified"] = response_headers.get("Last-Modified", state["last_modified"])
+            digest = hashlib.blake2b(self._live_region(html), digest_size=16).digest()
+            if digest == state["content_hash"]:
+                self.poll_stats["unchanged"] += 1
+            else:
+                state["content_hash"] = digest
+                self.poll_stats["parsed"] += 1
+                scorecard = self.extract_scorecard(html, href_of_the_match)
+                if scorecard is not None:
+                    changed = True
+                    if self.on_live_update is not None:
+                        result = self.on_live_update(href_of_the_match, scorecard)
+                        if inspect.isawaitable(result):
+                            await result
+        else:
+            # Error pages and failed requests keep the old validators and back off
+            self.poll_stats["errors"] += 1
+
+        # Reset to the base interval on change, back off while nothing moves
+        base = LIVE_POLL_INTERVALS[state["status"]]
+        state["interval"] = base if changed else min(state["interval"] * POLL_BACKOFF, MAX_POLL_INTERVAL)
+        state["next_poll"] = loop.time() + state["interval"]
+        return changed
 
+    @staticmethod
+    def _live_region(html):
+        """
+        The part of a live page that carries match data: the app-root-state
+        payload. Ads, timestamps and nonces elsewhere on the page must not
+        count as a change. Pages without it fall back to the whole body.
+        """
+        html = html.encode()
+        region = find_app_root_state(html)
+        return region if region is not None else html
+
+    async def poll_live_matches(self, stop_event=None, fixture_refresh_interval=60.0):
+        """
+        Long-running live poller.
+        Refreshes the fixture list periodically and re-fetches only matches
+        whose status is live or rain delay, each on its own adaptive interval.
+        """
+        stop_event = stop_event or asyncio.Event()
+        loop = asyncio.get_running_loop()
+        next_fixture_refresh = loop.time()
 
-# Create an instance of the class
-scraper = MatchScraper()
+        while not stop_event.is_set():
+            now = loop.time()
+            if now >= next_fixture_refresh:
+                await self.scrape_static_data()
+                self._sync_live_schedule(now)
+                next_fixture_refresh = now + fixture_refresh_interval
+
+            due = [href for href, state in self.poll_state.items() if state["next_poll"] <= now]
+            if due:
+                await asyncio.gather(*(self.scrape_live_data(href) for href in due))
+
+            next_wake = min([state["next_poll"] for state in self.poll_state.values()] + [next_fixture_refresh])
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=max(0.0, next_wake - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+
+    def extract_scorecard(self, html_content, url):
+        """Parse a match page's app-root-state into a CricketScorecard; None if it has no data."""
+        scorecard = CricketScorecard(url, html=html_content)
+        if scorecard.data is None:
+            return None
+        self.scorecards[url] = scorecard
+        return scorecard
+
+    async def _scrape_completed_match(self, match):
+        match_status = match["status"].strip().lower()
+        href_of_match = match["link"]
+        if href_of_match == "N/A":
+            return
+        if match_status in LIVE_POLL_INTERVALS:
+            # Live pages go through the conditional poller only, one GET each
+            await self.scrape_live_data(href_of_match)
+            return
+        html = await self.fetch_html(href_of_match, status=match_status)
+        if html:
+            self.extract_scorecard(html, href_of_match)
+
+    async def scrape_completed_matches(self):
+        """Fetch every match page in parallel on the shared session."""
+        await asyncio.gather(*(self._scrape_completed_match(match) for match in self.match_list))
+
+    def timing_summary(self):
+        """Summarise recorded fetch timings."""
+        if not self.fetch_timings:
+            return {"requests": 0, "total": 0.0, "mean": 0.0, "max": 0.0}
+        elapsed = [t["elapsed"] for t in self.fetch_timings]
+        return {
+            "requests": len(elapsed),
+            "total": sum(elapsed),
+            "mean": sum(elapsed) / len(elapsed),
+            "max": max(elapsed),
+        }
 
 
 # Run an async method
 # noinspection PyCompatibility
 async def main():
-    await scraper.scrape_static_data()
-    await scraper.scrape_completed_matches()
+    start = time.perf_counter()
+    cache = ResponseCache()
+    async with MatchScraper(cache=cache) as scraper:
+        await scraper.scrape_static_data()
+        await scraper.scrape_completed_matches()
+        summary = scraper.timing_summary()
+    print(f"Cache: {cache.stats()}")
+    cache.close()
+    wall_clock = time.perf_counter() - start
+    print(f"Fetched {summary['requests']} pages in {wall_clock:.2f}s wall-clock "
+          f"(sum of request times {summary['total']:.2f}s, mean {summary['mean']:.3f}s, max {summary['max']:.3f}s)")
+
+
+def print_live_update(href, scorecard):
+    totals = ", ".join(f"{scorecard.team_names.get(innings.team_id, innings.team_id)} "
+                       f"{scorecard.format_total(innings.total)}" for innings in scorecard.innings)
+    print(f"{time.strftime('%H:%M:%S')} {href}: {totals}")
+
+
+# noinspection PyCompatibility
+async def poll_live():
+    async with MatchScraper(on_live_update=print_live_update) as scraper:
+        try:
+            await scraper.poll_live_matches()
+        finally:
+            print(f"Live poll stats: {scraper.poll_stats}")
 
 
 # Run the event loop
-asyncio.run(main())
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'live':
+        asyncio.run(poll_live())
+    else:
+        asyncio.run(main())
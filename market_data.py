@@ -0,0 +1,124 @@
+import random
+import time
+from abc import ABC, abstractmethod
+
+
+class MarketDataAdapter(ABC):
+    """
+    Market-data interface used by the strategy engine. Prices are in
+    rupees; implementations should fetch many tokens in one call.
+    """
+
+    @abstractmethod
+    def get_quotes(self, tokens):
+        """Return {token: price} for the given tokens."""
+
+    @abstractmethod
+    def get_spot(self, symbol):
+        """Return the current price of an index, e.g. "Nifty 50"."""
+
+    def get_quote(self, token):
+        return self.get_quotes([token])[token]
+
+
+class CallableAdapter(MarketDataAdapter):
+    """
+    Adapter over per-token API functions. Duplicate tokens in a batch are
+    fetched once; swap in a broker batch endpoint by overriding get_quotes.
+    """
+
+    def __init__(self, option_price, spot_price):
+        self.option_price = option_price
+        self.spot_price = spot_price
+        self.requests = 0
+
+    def get_quotes(self, tokens):
+        quotes = {}
+        for token in dict.fromkeys(tokens):
+            quotes[token] = self.option_price(token)
+            self.requests += 1
+        return quotes
+
+    def get_spot(self, symbol):
+        self.requests += 1
+        return self.spot_price(symbol)
+
+
+class QuoteCache(MarketDataAdapter):
+    """
+    Short-TTL in-memory quote cache in front of another adapter. Within a
+    tick window every strategy asking for the same token shares one quote,
+    and all misses go upstream as a single batch.
+    """
+
+    def __init__(self, adapter, ttl=0.05, clock=time.monotonic):
+        self.adapter = adapter
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._quotes = {}  # token -> (price, fetched at)
+        self._spots = {}
+
+    def get_quotes(self, tokens):
+        now = self.clock()
+        quotes, missing = {}, []
+        for token in dict.fromkeys(tokens):
+            cached = self._quotes.get(token)
+            if cached is not None and now - cached[1] <= self.ttl:
+                quotes[token] = cached[0]
+            else:
+                missing.append(token)
+        self.hits += len(quotes)
+        if missing:
+            self.misses += len(missing)
+            fresh = self.adapter.get_quotes(missing)
+            for token, price in fresh.items():
+                self._quotes[token] = (price, now)
+            quotes.update(fresh)
+        return quotes
+
+    def get_spot(self, symbol):
+        now = self.clock()
+        cached = self._spots.get(symbol)
+        if cached is not None and now - cached[1] <= self.ttl:
+            self.hits += 1
+            return cached[0]
+        self.misses += 1
+        price = self.adapter.get_spot(symbol)
+        self._spots[symbol] = (price, now)
+        return price
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0}
+
+
+class SimulatedAdapter(MarketDataAdapter):
+    """Local random-walk quotes for testing; counts upstream calls and tokens."""
+
+    def __init__(self, spot=23500.0, option_price=100.0, volatility=0.002, seed=None):
+        self.spot = spot
+        self.default_price = option_price
+        self.volatility = volatility
+        self.prices = {}
+        self.calls = 0
+        self.tokens_requested = 0
+        self._random = random.Random(seed)
+
+    def _step(self, price):
+        return round(price * (1 + self._random.gauss(0, self.volatility)), 2)
+
+    def get_quotes(self, tokens):
+        self.calls += 1
+        quotes = {}
+        for token in tokens:
+            self.tokens_requested += 1
+            self.prices[token] = self._step(self.prices.get(token, self.default_price))
+            quotes[token] = self.prices[token]
+        return quotes
+
+    def get_spot(self, symbol):
+        self.calls += 1
+        self.spot = self._step(self.spot)
+        return self.spot
@@ -0,0 +1,203 @@
+"""
+Fixture-list -> per-match scorecard scraping pipeline.
+
+Stages are async generators: fixture lists yield match cards, a bounded
+pool turns each card into a record with the chosen backend, and records
+are streamed to NDJSON or Parquet as they are produced. A stage only
+pulls more input when the next one has room, so memory stays flat no
+matter how many tournaments are scraped.
+
+Backends per match:
+  lxml        the fixture-card fields only (no per-match request)
+  json        CricketScorecard from the page's app-root-state JSON
+  playwright  the JS-rendered tables via the yyy.py browser pool
+  auto        json for finished matches, lxml for live/upcoming ones
+
+Usage: python pipeline.py [FIXTURE_URL ...] --backend auto --format ndjson --out results.ndjson
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output needs pyarrow; NDJSON always works
+    pa = None
+
+from http_cache import ResponseCache, is_completed
+from main import MatchScraper
+from temp import CricketScorecard
+
+BACKENDS = ('auto', 'lxml', 'json', 'playwright')
+MATCH_FIELDS = ('team1', 'team1_score', 'team2', 'team2_score', 'status', 'link')
+
+
+def choose_backend(match, backend):
+    if backend != 'auto':
+        return backend
+    if match['link'] == 'N/A':
+        return 'lxml'
+    return 'json' if is_completed(match['status']) else 'lxml'
+
+
+async def fixture_matches(scraper, fixture_urls, streaming=False):
+    """Stage 1: yield every match card from each fixture list in turn."""
+    for url in fixture_urls:
+        scraper.base_url = url
+        await scraper.scrape_static_data(streaming=streaming)
+        matches, scraper.match_list = scraper.match_list, []
+        for match in matches:
+            yield dict(match, fixture_url=url)
+
+
+async def bounded_map(source, func, concurrency):
+    """
+    Stage helper: run func over an async source with at most `concurrency`
+    calls in flight, yielding results as they finish. The source is only
+    pulled when a slot frees up, which is what provides backpressure.
+    """
+    pending = set()
+    async for item in source:
+        pending.add(asyncio.ensure_future(func(item)))
+        if len(pending) >= concurrency:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            yield task.result()
+
+
+class ScorecardStage:
+    """Stage 2: turn one match card into an output record with the chosen backend."""
+
+    def __init__(self, scraper, backend='auto', browser_pool=None, cache=None):
+        self.scraper = scraper
+        self.backend = backend
+        self.browser_pool = browser_pool
+        self.cache = cache
+
+    async def __call__(self, match):
+        backend = choose_backend(match, self.backend)
+        record = {field: match.get(field) for field in MATCH_FIELDS}
+        record.update(fixture_url=match.get('fixture_url'), backend=backend, scorecard=None, error=None)
+        try:
+            if backend == 'json':
+                html = await self.scraper.fetch_html(match['link'], status=match['status'])
+                if html:
+                    record['scorecard'] = CricketScorecard(match['link'], html=html).to_record()
+                else:
+                    record['error'] = 'fetch failed'
+            elif backend == 'playwright':
+                from yyy import scrape_scorecard
+                record['scorecard'] = await scrape_scorecard(self.browser_pool, match['link'], self.cache,
+                                                             match['status'])
+        except Exception as e:  # one bad match must not stop the stream
+            record['error'] = f'{type(e).__name__}: {e}'
+        return record
+
+
+class NdjsonSink:
+    """Stage 3: one JSON object per line, flushed every flush_every records."""
+
+    def __init__(self, path=None, flush_every=100):
+        self._file = open(path, 'a', encoding='utf-8') if path else sys.stdout
+        self.flush_every = flush_every
+        self.records = 0
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        self.records += 1
+        if self.records % self.flush_every == 0:
+            self._file.flush()
+
+    def close(self):
+        self._file.flush()
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+class ParquetSink:
+    """Stage 3: Parquet row groups of row_group_size records; scorecards as JSON strings."""
+
+    def __init__(self, path, row_group_size=500):
+        if pa is None:
+            raise ImportError("pyarrow is required for Parquet output")
+        self.schema = pa.schema([(name, pa.string()) for name in
+                                 MATCH_FIELDS + ('fixture_url', 'backend', 'scorecard', 'error')])
+        self._writer = pq.ParquetWriter(path, self.schema)
+        self.row_group_size = row_group_size
+        self._rows = []
+        self.records = 0
+
+    def write(self, record):
+        record = dict(record, scorecard=None if record['scorecard'] is None else json.dumps(record['scorecard']))
+        self._rows.append(record)
+        self.records += 1
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+async def run_pipeline(fixture_urls, sink, backend='auto', concurrency=16, use_cache=True, streaming=False,
+                       browser_pool_size=2):
+    cache = ResponseCache() if use_cache else None
+    browser_pool = None
+    try:
+        if backend == 'playwright':
+            # Imported lazily so the other backends do not need Playwright installed
+            from yyy import BrowserPool
+            browser_pool = BrowserPool(size=browser_pool_size)
+            await browser_pool.start()
+
+        async with MatchScraper(max_concurrency=concurrency, cache=cache) as scraper:
+            stage = ScorecardStage(scraper, backend, browser_pool, cache)
+            records = bounded_map(fixture_matches(scraper, fixture_urls, streaming), stage, concurrency)
+            async for record in records:
+                sink.write(record)
+    finally:
+        sink.close()
+        if browser_pool is not None:
+            await browser_pool.close()
+        if cache is not None:
+            print(f"Cache: {cache.stats()}", file=sys.stderr)
+            cache.close()
+    return sink.records
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scrape fixture lists and their scorecards as a stream.')
+    parser.add_argument('fixture_urls', nargs='*', default=[MatchScraper().base_url])
+    parser.add_argument('--backend', choices=BACKENDS, default='auto')
+    parser.add_argument('--format', choices=('ndjson', 'parquet'), default='ndjson')
+    parser.add_argument('--out', default=None, help='output file (NDJSON defaults to stdout)')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--streaming', action='store_true', help='parse fixture lists incrementally')
+    args = parser.parse_args()
+
+    if args.format == 'parquet':
+        if not args.out:
+            parser.error('--out is required for Parquet output')
+        sink = ParquetSink(args.out)
+    else:
+        sink = NdjsonSink(args.out)
+
+    count = asyncio.run(run_pipeline(args.fixture_urls, sink, args.backend, args.concurrency,
+                                     not args.no_cache, args.streaming))
+    print(f"Wrote {count} records", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+import json
+import time
+from collections import defaultdict
+
+from local_http import LocalHTTPServer
+
+
+class PnLAggregator:
+    """
+    Incremental MTM rollups. Every price change adjusts the running sums
+    per strategy, per (strategy, trade number) and for the portfolio by the
+    leg's delta, so each update is O(1) and snapshots are precomputed.
+    Legs are short premium: MTM = entry - current price.
+    """
+
+    def __init__(self):
+        self._legs = {}  # leg id -> [strategy id, trade number, entry price, last mtm]
+        self.by_strategy = defaultdict(float)
+        self.by_trade = defaultdict(float)
+        self.realised_by_strategy = defaultdict(float)
+        self.total = 0.0
+        self.open_legs = 0
+        self.version = 0
+        self.updated_at = None
+        self._callbacks = []
+        self._snapshot = None
+        self._snapshot_version = -1
+        self._published_version = -1
+
+    def add_leg(self, leg_id, strategy_id, trade_number, entry_price):
+        self._legs[leg_id] = [strategy_id, trade_number, entry_price, 0.0]
+        self.by_strategy[strategy_id] += 0.0
+        self.by_trade[(strategy_id, trade_number)] += 0.0
+        self.open_legs += 1
+        self._touch()
+
+    def update(self, leg_id, price):
+        leg = self._legs[leg_id]
+        mtm = leg[2] - price
+        delta = mtm - leg[3]
+        if delta:
+            leg[3] = mtm
+            self.by_strategy[leg[0]] += delta
+            self.by_trade[(leg[0], leg[1])] += delta
+            self.total += delta
+            self._touch()
+
+    def close(self, leg_id, exit_price):
+        """Final mark at the exit price; the leg's MTM becomes realised."""
+        self.update(leg_id, exit_price)
+        strategy_id, _, _, mtm = self._legs.pop(leg_id)
+        self.realised_by_strategy[strategy_id] += mtm
+        self.open_legs -= 1
+        self._touch()
+
+    def _touch(self):
+        self.version += 1
+        self.updated_at = time.time()
+
+    def subscribe(self, callback):
+        """callback(snapshot) is called from publish(), once per tick batch at most."""
+        self._callbacks.append(callback)
+
+    def publish(self):
+        if self._callbacks and self._published_version != self.version:
+            snapshot = self.snapshot()
+            self._published_version = self.version
+            for callback in self._callbacks:
+                callback(snapshot)
+
+    def snapshot(self):
+        """Current rollup; rebuilt only when something changed since the last call."""
+        if self._snapshot_version != self.version:
+            self._snapshot = {
+                'total': self.total,
+                'open_legs': self.open_legs,
+                'strategies': dict(self.by_strategy),
+                'realised': dict(self.realised_by_strategy),
+                'trades': {f'{strategy_id}/{trade_number}': mtm
+                           for (strategy_id, trade_number), mtm in self.by_trade.items()},
+                'updated_at': self.updated_at,
+                'version': self.version,
+            }
+            self._snapshot_version = self.version
+        return self._snapshot
+
+
+class PnLServer(LocalHTTPServer):
+    """Local HTTP endpoint serving the aggregator snapshot as JSON on GET /pnl."""
+
+    paths = ('/', '/pnl')
+    content_type = 'application/json'
+    not_found = b'{"error": "not found"}'
+
+    def __init__(self, aggregator, host='127.0.0.1', port=8765):
+        super().__init__(host, port)
+        self.aggregator = aggregator
+
+    def body(self):
+        return json.dumps(self.aggregator.snapshot()).encode()
@@ -0,0 +1,109 @@
+import numpy as np
+
+# Exit reasons as returned by PositionBook.due_exits
+EXIT_NONE, EXIT_STOPLOSS, EXIT_TARGET, EXIT_TIME = 0, 1, 2, 3
+EXIT_TYPES = {EXIT_STOPLOSS: 'Stoploss', EXIT_TARGET: 'Target', EXIT_TIME: 'Time'}
+
+
+class PositionBook:
+    """
+    Structure-of-arrays book of open option legs. Every leg is one row
+    across NumPy columns; tick batches update prices and evaluate every
+    exit condition for all open legs in one vectorized pass. Closing a leg
+    moves the last row into its slot, so rows are always the open legs and
+    per-tick work does not grow with legs closed earlier in the session.
+    Realised MTM lives in PnLAggregator.
+    Legs are short premium: stoploss above entry, target below.
+    """
+
+    _COLUMNS = ('trade_id', 'token', 'entry', 'stoploss', 'target', 'exit_ts', 'curr_price')
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.trade_id = np.zeros(capacity, dtype=np.int64)
+        self.token = np.zeros(capacity, dtype=np.int64)
+        for name in self._COLUMNS[2:]:
+            setattr(self, name, np.full(capacity, np.nan))
+        self._row = {}  # trade id -> row index
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def open_count(self):
+        return self.size
+
+    def _grow(self):
+        capacity = len(self.token) * 2
+        for name in self._COLUMNS:
+            old = getattr(self, name)
+            fill = np.nan if old.dtype == np.float64 else 0
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def add(self, trade_id, token, entry, stoploss, target, exit_ts):
+        if self.size == len(self.token):
+            self._grow()
+        row = self.size
+        self.trade_id[row] = trade_id
+        self.token[row] = token
+        self.entry[row] = entry
+        self.stoploss[row] = stoploss
+        self.target[row] = target
+        self.exit_ts[row] = exit_ts
+        self.curr_price[row] = entry
+        self._row[trade_id] = row
+        self.size += 1
+        return row
+
+    def row(self, trade_id):
+        return self._row[trade_id]
+
+    def close(self, trade_id):
+        """Remove a leg; the last row is moved into its slot."""
+        row = self._row.pop(trade_id)
+        last = self.size - 1
+        if row != last:
+            for name in self._COLUMNS:
+                column = getattr(self, name)
+                column[row] = column[last]
+            self._row[int(self.trade_id[row])] = row
+        self.size = last
+
+    def update_prices(self, tokens, prices):
+        """Set the current price of every open leg on the given tokens."""
+        tokens = np.asarray(tokens, dtype=np.int64)
+        if not len(tokens) or not self.size:
+            return
+        order = np.argsort(tokens)
+        tokens, prices = tokens[order], np.asarray(prices, dtype=np.float64)[order]
+        book_tokens = self.token[:self.size]
+        pos = np.minimum(np.searchsorted(tokens, book_tokens), len(tokens) - 1)
+        hit = tokens[pos] == book_tokens
+        self.curr_price[:self.size][hit] = prices[pos[hit]]
+
+    def due_exits(self, now_ts):
+        """
+        Evaluate stoploss, target and exit time for all open legs at once.
+        Returns (trade ids, exit codes, current prices) of legs to close.
+        """
+        n = self.size
+        price = self.curr_price[:n]
+        stoploss = price >= self.stoploss[:n]
+        target = ~stoploss & (price <= self.target[:n])
+        timed = ~stoploss & ~target & (now_ts >= self.exit_ts[:n])
+
+        codes = np.zeros(n, dtype=np.int8)
+        codes[stoploss] = EXIT_STOPLOSS
+        codes[target] = EXIT_TARGET
+        codes[timed] = EXIT_TIME
+        rows = np.flatnonzero(codes)
+        return self.trade_id[rows], codes[rows], price[rows]
+
+    def next_exit_ts(self):
+        return float(self.exit_ts[:self.size].min()) if self.size else None
+
+    def mtm(self):
+        """Per-leg mark-to-market (entry - current, short premium) of open legs, in row order."""
+        return self.entry[:self.size] - self.curr_price[:self.size]
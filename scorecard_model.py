@@ -0,0 +1,184 @@
+from array import array
+
+import numpy as np
+import pandas as pd
+
+
+def _rates(numerator, denominator, scale):
+    """numerator * scale / denominator, 0.0 where the denominator is 0."""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    out = np.zeros(len(numerator), dtype=np.float64)
+    np.divide(numerator * scale, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def overs_from_balls(balls):
+    """Cricket overs notation (e.g. 23 balls -> 3.5) for an array of ball counts."""
+    balls = np.asarray(balls, dtype=np.int64)
+    return balls // 6 + (balls % 6) / 10
+
+
+class Batting:
+    """Batting card for one innings, one typed array per stat."""
+    __slots__ = ('player_ids', 'runs', 'balls', 'fours', 'sixes', 'yet_to_bat')
+
+    def __init__(self):
+        self.player_ids = []
+        self.runs = array('i')
+        self.balls = array('i')
+        self.fours = array('i')
+        self.sixes = array('i')
+        self.yet_to_bat = []
+
+    @classmethod
+    def parse(cls, rows):
+        """Parse "id.runs.balls.4s.6s" rows; "id.-" rows are yet to bat."""
+        batting = cls()
+        for row in rows:
+            stats = row.split(".")
+            if len(stats) >= 5:
+                batting.player_ids.append(stats[0])
+                batting.runs.append(int(stats[1]))
+                batting.balls.append(int(stats[2]))
+                batting.fours.append(int(stats[3]))
+                batting.sixes.append(int(stats[4]))
+            elif len(stats) == 2 and stats[1] == "-":
+                batting.yet_to_bat.append(stats[0])
+        return batting
+
+    def strike_rates(self):
+        return _rates(self.runs, self.balls, 100)
+
+    def __len__(self):
+        return len(self.player_ids)
+
+
+class Bowling:
+    """Bowling card for one innings, one typed array per stat."""
+    __slots__ = ('player_ids', 'runs', 'balls', 'maidens', 'wickets')
+
+    def __init__(self):
+        self.player_ids = []
+        self.runs = array('i')
+        self.balls = array('i')
+        self.maidens = array('i')
+        self.wickets = array('i')
+
+    @classmethod
+    def parse(cls, rows):
+        """Parse "id.runs.balls.maidens.wickets" rows."""
+        bowling = cls()
+        for row in rows:
+            stats = row.split(".")
+            if len(stats) >= 5:
+                bowling.player_ids.append(stats[0])
+                bowling.runs.append(int(stats[1]))
+                bowling.balls.append(int(stats[2]))
+                bowling.maidens.append(int(stats[3]))
+                bowling.wickets.append(int(stats[4]))
+        return bowling
+
+    def economies(self):
+        return _rates(self.runs, self.balls, 6)
+
+    def __len__(self):
+        return len(self.player_ids)
+
+
+class Total:
+    """Innings total parsed from strings like "189/2(60"."""
+    __slots__ = ('text', 'score', 'balls')
+
+    def __init__(self, text, score=None, balls=None):
+        self.text = text
+        self.score = score
+        self.balls = balls
+
+    @classmethod
+    def parse(cls, total_str):
+        text = total_str.strip()
+        if text.endswith('"'):
+            text = text[:-1]
+        parts = text.split("(")
+        if len(parts) == 2:
+            try:
+                return cls(text, parts[0].strip(), int(parts[1].replace(")", "").strip()))
+            except ValueError:
+                pass
+        return cls(text)
+
+    @property
+    def overs(self):
+        if self.balls is None:
+            return None
+        return f"{self.balls // 6}.{self.balls % 6}"
+
+
+class Innings:
+    """One team's innings from an sC4.php entry."""
+    __slots__ = ('team_id', 'total', 'batting', 'bowling')
+
+    def __init__(self, team_id, total, batting, bowling):
+        self.team_id = team_id
+        self.total = total
+        self.batting = batting
+        self.bowling = bowling
+
+    @classmethod
+    def from_team_data(cls, team_data):
+        return cls(
+            team_data.get("c"),
+            Total.parse(team_data.get("d", "")),
+            Batting.parse(team_data.get("b", [])),
+            Bowling.parse(team_data.get("a", [])),
+        )
+
+
+def _empty_stats(columns):
+    """Zero-row result with the same dtypes as a populated one."""
+    return pd.DataFrame({
+        "innings": pd.Series(dtype=np.int64), "team_id": pd.Series(dtype=object),
+        columns[0]: pd.Series(dtype=object), **{name: pd.Series(dtype=np.int64) for name in columns[1:]},
+    })
+
+
+def _stat_columns(team_data_list, key, columns):
+    """Split every innings' stat rows in one vectorized pass."""
+    innings_idx, team_ids, rows = [], [], []
+    for i, team_data in enumerate(team_data_list):
+        team_rows = team_data.get(key, [])
+        rows.extend(team_rows)
+        innings_idx.extend([i] * len(team_rows))
+        team_ids.extend([team_data.get("c")] * len(team_rows))
+
+    if not rows:  # .str on an empty column has no string dtype to work with
+        return _empty_stats(columns)
+    frame = pd.DataFrame({"innings": innings_idx, "team_id": team_ids, "raw": rows})
+    parts = frame["raw"].str.split(".", expand=True)
+    if parts.shape[1] < len(columns):
+        return _empty_stats(columns)
+
+    # Rows without all five numeric fields (e.g. "id.-" yet to bat) are dropped
+    parts = parts.iloc[:, :len(columns)]
+    parts.columns = columns
+    numeric = parts[columns[1:]].apply(pd.to_numeric, errors="coerce")
+    keep = numeric.notna().all(axis=1)
+    result = pd.concat([frame.loc[keep, ["innings", "team_id"]], parts.loc[keep, ["player_id"]],
+                        numeric[keep].astype(np.int64)], axis=1)
+    return result.reset_index(drop=True)
+
+
+def batting_frame(team_data_list):
+    """Batting rows of many innings as columns, with vectorized strike rate."""
+    df = _stat_columns(team_data_list, "b", ["player_id", "runs", "balls", "fours", "sixes"])
+    df["strike_rate"] = _rates(df["runs"], df["balls"], 100)
+    return df
+
+
+def bowling_frame(team_data_list):
+    """Bowling rows of many innings as columns, with vectorized overs and economy."""
+    df = _stat_columns(team_data_list, "a", ["player_id", "runs", "balls", "maidens", "wickets"])
+    df["overs"] = overs_from_balls(df["balls"])
+    df["economy"] = _rates(df["runs"], df["balls"], 6)
+    return df
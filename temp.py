@@ -1,134 +1,259 @@
 
 
+import asyncio
+import sys
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
-import json
+
+from app_state import extract_app_root_state
+from http_cache import ResponseCache, ttl_for_status
+from scorecard_model import Innings
+
+PLAYER_MAP_KEY = "https://oc.crickapi.com/mapping/getHomeMapData"
+SCORECARD_KEY = "https://api-v1.com/w/sC4.php"
+
+
+class PlayerNameCache:
+    """Size-bounded LRU of player id -> name, shared across scorecards."""
+
+    def __init__(self, maxsize=50000):
+        self.maxsize = maxsize
+        self._names = OrderedDict()
+
+    def get(self, player_id):
+        name = self._names.get(player_id)
+        if name is not None:
+            self._names.move_to_end(player_id)
+        return name
+
+    def add_players(self, players):
+        """Insert ids from a getHomeMapData "p" list that are not cached yet, evicting the least recently used."""
+        names = self._names
+        for player in players:
+            player_id = player["f_key"]
+            if player_id not in names:
+                names[player_id] = player["n"]
+        while len(names) > self.maxsize:
+            names.popitem(last=False)
+
+    def __len__(self):
+        return len(self._names)
+
+
+# Process-wide: tournament batches keep seeing the same rosters
+player_name_cache = PlayerNameCache()
+
 
 class CricketScorecard:
-    def __init__(self, url):
-        """Initialize with the scorecard URL and fetch data."""
+    def __init__(self, url, html=None, cache=None, status=None):
+        """
+        Initialize with the scorecard URL and fetch data (or use already-fetched html).
+        An optional ResponseCache is consulted first; status sets its TTL.
+        """
         self.url = url
-        self.data = self._fetch_and_parse_data()
-        self.team1_data = None
-        self.team2_data = None
+        self.cache = cache
+        self.status = status
+        self.data = self._fetch_and_parse_data(html)
+        self.scorecard_data = []
+        self.team_ids = self._team_ids_from_url(url)
+        self.team_names = {}
+        self._roster = None  # page-local index, only built if a name was evicted from the shared cache
+        self.innings = []
         if self.data:
+            self._index_players()
             self._assign_team_data()
 
-    def _fetch_and_parse_data(self):
-        """Fetch HTML content and parse the JSON data."""
-        response = requests.get(self.url)
-        html_content = response.text
-        soup = BeautifulSoup(html_content, "html.parser")
-        script_tag = soup.find("script", id="app-root-state")
+    @classmethod
+    async def from_urls(cls, urls, max_concurrency=32, limit_per_host=16, request_timeout=30, cache=None,
+                        status=None):
+        """
+        Fetch and parse many scorecards concurrently on one pooled session.
+        Returns scorecards in the same order as urls, with None for any page
+        that failed to fetch, answered with a non-200 status, or had no
+        scorecard data. Pass a result status (e.g. "completed") to
+        cache finished scorecards forever.
+        """
+        connector = aiohttp.TCPConnector(limit=max_concurrency, limit_per_host=limit_per_host)
+        timeout = aiohttp.ClientTimeout(total=request_timeout)
+        semaphore = asyncio.Semaphore(max_concurrency)
 
-        if not script_tag:
-            print("Could not find app-root-state script tag.")
-            return None
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            def parse(url, html):
+                try:
+                    scorecard = cls(url, html=html)
+                except Exception as e:  # one bad payload must not fail the batch
+                    print(f"Error parsing {url}: {type(e).__name__}: {e}", file=sys.stderr)
+                    return None
+                return scorecard if scorecard.data is not None else None
 
-        json_str = script_tag.string.strip().replace('&q;', '"')
+            async def load(url):
+                html = cache.get(url) if cache is not None else None
+                if html is not None:
+                    return parse(url, html)
+                async with semaphore:
+                    try:
+                        async with session.get(url) as response:
+                            if response.status != 200:
+                                print(f"Error fetching {url}: HTTP {response.status}", file=sys.stderr)
+                                return None
+                            html = await response.read()
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        print(f"Error fetching {url}: {e}", file=sys.stderr)
+                        return None
+                if cache is not None:
+                    cache.put(url, html, ttl_for_status(status))
+                return parse(url, html)
+
+            return await asyncio.gather(*(load(url) for url in urls))
+
+    def _fetch_and_parse_data(self, html=None):
+        """Fetch HTML content and parse the JSON data."""
+        if html is None and self.cache is not None:
+            html = self.cache.get(self.url)
+        if html is None:
+            response = requests.get(self.url)
+            html = response.content
+            if self.cache is not None and response.status_code == 200:
+                self.cache.put(self.url, html, ttl_for_status(self.status))
         try:
-            return json.loads(json_str)
-        except json.JSONDecodeError as e:
-            print(f"Error decoding JSON: {e}")
+            data = extract_app_root_state(html)
+        except ValueError as e:
+            print(f"Error decoding JSON: {e}", file=sys.stderr)
             return None
 
+        if data is None:
+            print("Could not find app-root-state script tag.", file=sys.stderr)
+        return data
+
+    @staticmethod
+    def _team_ids_from_url(url):
+        """
+        Team ids are the two path segments before the "a-vs-b" slug, e.g.
+        .../16th-Match/122/123/byr-vs-hor-.../scorecard or .../Final/3J/3M/saca-vs-vic-.../scorecard
+        """
+        segments = [segment for segment in urlparse(url).path.split("/") if segment]
+        for i, segment in enumerate(segments):
+            if "-vs-" in segment and i >= 2:
+                return segments[i - 2:i]
+        return []
+
     def _assign_team_data(self):
-        """Assign team data based on team IDs."""
-        scorecard_data = self.data.get("https://api-v1.com/w/sC4.php", [])
-        if not scorecard_data or len(scorecard_data) < 2:
-            print("Scorecard data not found or incomplete.")
+        """Build one innings per sC4.php entry and resolve the teams involved."""
+        self.scorecard_data = self.data.get(SCORECARD_KEY, [])
+        if not self.scorecard_data:
+            print("Scorecard data not found or incomplete.", file=sys.stderr)
             return
 
-        self.team1_data = next((item for item in scorecard_data if item["c"] == "122"), None)  # Hornchurch
-        self.team2_data = next((item for item in scorecard_data if item["c"] == "123"), None)  # Byron
+        # URL order first, then any team that only shows up in the payload
+        for item in self.scorecard_data:
+            if item.get("c") and item["c"] not in self.team_ids:
+                self.team_ids.append(item["c"])
+
+        teams = {t.get("f_key"): t for t in self.data.get(PLAYER_MAP_KEY, {}).get("t", [])}
+        for team_id in self.team_ids:
+            team = teams.get(team_id, {})
+            name = team.get("n") or f"Team {team_id}"
+            short_name = team.get("sn")
+            self.team_names[team_id] = f"{name} ({short_name})" if short_name else name
+
+        self.innings = [Innings.from_team_data(item) for item in self.scorecard_data]
 
-        if not self.team1_data or not self.team2_data:
-            print("Could not find data for both teams.")
+    def _index_players(self):
+        """Add this page's roster to the shared player cache; ids already seen are skipped."""
+        player_name_cache.add_players(self.data.get(PLAYER_MAP_KEY, {}).get("p", []))
 
     def get_player_name(self, player_id):
         """Get player name from player ID."""
-        players = self.data.get("https://oc.crickapi.com/mapping/getHomeMapData", {}).get("p", [])
-        player = next((p for p in players if p["f_key"] == player_id), None)
-        return player["n"] if player else f"Player {player_id}"
+        name = player_name_cache.get(player_id)
+        if name is None and self.data:
+            if self._roster is None:
+                players = self.data.get(PLAYER_MAP_KEY, {}).get("p", [])
+                self._roster = {p["f_key"]: p["n"] for p in players}
+            name = self._roster.get(player_id)
+        return name if name is not None else f"Player {player_id}"
 
-    def format_total(self, total_str):
+    def to_record(self):
+        """Plain-dict view of the scorecard model for serialisation."""
+        innings_records = []
+        for innings in self.innings:
+            batting, bowling = innings.batting, innings.bowling
+            strike_rates, economies = batting.strike_rates(), bowling.economies()
+            innings_records.append({
+                "team_id": innings.team_id,
+                "team": self.team_names.get(innings.team_id),
+                "total": self.format_total(innings.total),
+                "batting": [
+                    {"player": self.get_player_name(player_id), "runs": batting.runs[i], "balls": batting.balls[i],
+                     "fours": batting.fours[i], "sixes": batting.sixes[i], "strike_rate": round(float(strike_rates[i]), 2)}
+                    for i, player_id in enumerate(batting.player_ids)
+                ],
+                "yet_to_bat": [self.get_player_name(p) for p in batting.yet_to_bat],
+                "bowling": [
+                    {"player": self.get_player_name(player_id), "balls": bowling.balls[i], "maidens": bowling.maidens[i],
+                     "runs": bowling.runs[i], "wickets": bowling.wickets[i], "economy": round(float(economies[i]), 2)}
+                    for i, player_id in enumerate(bowling.player_ids)
+                ],
+            })
+        return {"url": self.url, "teams": self.team_names, "innings": innings_records}
+
+    def format_total(self, total):
         """Format the total score with overs instead of balls."""
-        # Clean the string (e.g., "189/2(60" -> remove any trailing quote)
-        total_str = total_str.strip()
-        if total_str.endswith('"'):
-            total_str = total_str[:-1]
-
-        # Split by "(" to separate score and balls
-        parts = total_str.split("(")
-        if len(parts) == 2:
-            score = parts[0].strip()  # e.g., "189/2"
-            balls_str = parts[1].replace(")", "").strip()  # e.g., "60"
-            try:
-                balls = int(balls_str)
-                overs = balls // 6
-                remainder = balls % 6
-                overs_str = f"{overs}.{remainder}"
-                return f"{score} ({overs_str})"
-            except ValueError:
-                return total_str  # Return original if parsing fails
-        return total_str
-
-    def print_batting_stats(self, team_name, batting_data):
+        if total.overs is None:
+            return total.text  # Return original if parsing fails
+        return f"{total.score} ({total.overs})"
+
+    def print_batting_stats(self, team_name, batting):
         """Print batting statistics, including yet-to-bat players."""
         print(f"\n{team_name} Batting Scorecard:")
         print("Player Name            | Runs | Balls | 4s | 6s | SR")
         print("-" * 60)
 
-        yet_to_bat = []
-        for player in batting_data:
-            stats = player.split(".")
-            if len(stats) >= 5:
-                # Batted player
-                player_id, runs, balls, fours, sixes = stats[:5]
-                player_name = self.get_player_name(player_id)
-                strike_rate = f"{(int(runs) / int(balls) * 100):.2f}" if int(balls) > 0 else "0.00"
-                print(f"{player_name:<22} | {runs:<4} | {balls:<5} | {fours:<2} | {sixes:<2} | {strike_rate}")
-            elif len(stats) == 2 and stats[1] == "-":
-                # Yet-to-bat player
-                player_id = stats[0]
-                player_name = self.get_player_name(player_id)
-                yet_to_bat.append(player_name)
-
-        if yet_to_bat:
-            print("\nYet to Bat: " + ", ".join(yet_to_bat))
-
-    def print_bowling_stats(self, team_name, bowling_data):
+        strike_rates = batting.strike_rates()
+        for i, player_id in enumerate(batting.player_ids):
+            player_name = self.get_player_name(player_id)
+            print(f"{player_name:<22} | {batting.runs[i]:<4} | {batting.balls[i]:<5} | "
+                  f"{batting.fours[i]:<2} | {batting.sixes[i]:<2} | {strike_rates[i]:.2f}")
+
+        if batting.yet_to_bat:
+            print("\nYet to Bat: " + ", ".join(self.get_player_name(p) for p in batting.yet_to_bat))
+
+    def print_bowling_stats(self, team_name, bowling):
         """Print bowling statistics for a team."""
         print(f"\n{team_name} Bowling Scorecard:")
         print("Player Name            | Overs | Maidens | Runs | Wickets | ER")
         print("-" * 60)
-        for player in bowling_data:
-            stats = player.split(".")
-            if len(stats) >= 5:
-                player_id, runs, balls, maidens, wickets = stats[:5]
-                overs = f"{int(balls) // 6}.{int(balls) % 6}"
-                player_name = self.get_player_name(player_id)
-                economy_rate = f"{(int(runs) / (int(balls) / 6)):.2f}" if int(balls) > 0 else "0.00"
-                print(f"{player_name:<22} | {overs:<5} | {maidens:<7} | {runs:<4} | {wickets:<7} | {economy_rate}")
+        economies = bowling.economies()
+        for i, player_id in enumerate(bowling.player_ids):
+            balls = bowling.balls[i]
+            overs = f"{balls // 6}.{balls % 6}"
+            player_name = self.get_player_name(player_id)
+            print(f"{player_name:<22} | {overs:<5} | {bowling.maidens[i]:<7} | {bowling.runs[i]:<4} | "
+                  f"{bowling.wickets[i]:<7} | {economies[i]:.2f}")
+
+    def print_innings(self, team_name, innings):
+        print(f"\n{team_name} Total: {self.format_total(innings.total)}")
+        self.print_batting_stats(team_name, innings.batting)
+        self.print_bowling_stats(team_name, innings.bowling)
 
     def display_scorecard(self):
-        """Display the full scorecard for both teams."""
-        if not self.team1_data or not self.team2_data:
+        """Display the full scorecard, one section per innings."""
+        if not self.innings:
             print("Cannot display scorecard due to missing team data.")
             return
 
-        # Hornchurch Scorecard
-        print(f"\nHornchurch (HOR) Total: {self.format_total(self.team1_data['d'])}")
-        self.print_batting_stats("Hornchurch (HOR)", self.team1_data["b"])
-        self.print_bowling_stats("Hornchurch (HOR)", self.team1_data["a"])
-
-        # Byron Scorecard
-        print(f"\nByron (BYR) Total: {self.format_total(self.team2_data['d'])}")
-        self.print_batting_stats("Byron (BYR)", self.team2_data["b"])
-        self.print_bowling_stats("Byron (BYR)", self.team2_data["a"])
+        for innings in self.innings:
+            self.print_innings(self.team_names.get(innings.team_id, f"Team {innings.team_id}"), innings)
 
 # Usage
 if __name__ == "__main__":
     url = "https://crex.live/scoreboard/T7A/1R4/16th-Match/122/123/byr-vs-hor-16th-match-european-cricketleague-2025/scorecard"
-    scorecard = CricketScorecard(url)
-    scorecard.display_scorecard()
\ No newline at end of file
+    cache = ResponseCache()
+    scorecard = CricketScorecard(url, cache=cache, status="completed")
+    scorecard.display_scorecard()
+    print(f"Cache: {cache.stats()}")
+
+    # Batch: many scorecards concurrently on one pooled client
+    # scorecards = asyncio.run(CricketScorecard.from_urls([url, ...]))
\ No newline at end of file
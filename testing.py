@@ -2,12 +2,29 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import asyncio
-import aiofiles  # For async file I/O
-from collections import defaultdict, deque
+import itertools
+from collections import Counter, defaultdict, deque
 import os
-from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
+import hashlib
+import json
 import logging
+import multiprocessing
+import queue
+import time
+
+from latency import NULL_RECORDER, LatencyRecorder, MetricsServer, export_periodically, monitor_loop_lag
+from market_data import CallableAdapter, QuoteCache
+from pnl_aggregator import PnLAggregator, PnLServer
+from position_book import EXIT_TIME, EXIT_TYPES, PositionBook
+from tick_engine import EntryScheduler, PollingTickSource, TickBus
+from trade_journal import TradeJournal
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # falls back to the pandas C parser, no snapshot
+    pa = None
 
 
 # Mock external functions (replace with actual implementations)
@@ -28,9 +45,119 @@ def get_ini_details(file_path): return {
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CONTRACT_DTYPES = {
+    'FinInstrmId': 'int64', 'UndrlygFinInstrmId': 'int64', 'FinInstrmNm': 'category',
+    'TckrSymb': 'category', 'XpryDt': 'float64', 'StrkPric': 'float64', 'OptnTp': 'category',
+    'StockNm': 'category'
+}
+CONTRACT_EPOCH = pd.Timestamp('1980-01-01')  # XpryDt is seconds since this date
+EXPIRY_FORMAT = '%d-%b-%y'
+
+
+def at_time_today(hhmmss, now=None):
+    """'HH:MM:SS' -> datetime on today's date."""
+    now = now or datetime.now()
+    return datetime.combine(now.date(), datetime.strptime(hhmmss, '%H:%M:%S').time())
+
+
+def to_expiry_date(expiry):
+    """Normalise an expiry ('23-Jan-25', datetime, Timestamp or date) to a date."""
+    if isinstance(expiry, str):
+        return datetime.strptime(expiry, EXPIRY_FORMAT).date()
+    if isinstance(expiry, datetime):  # also pd.Timestamp
+        return expiry.date()
+    return expiry
+
+
+class ContractIndex:
+    """
+    Instrument lookup built once from the contract table.
+    Contracts are sorted by strike within each (symbol, expiry, option type)
+    chain into two flat arrays, and chains map to slices of them, so single
+    and batch lookups are a searchsorted. The arrays can be written as an
+    Arrow IPC file and memory-mapped by other processes without a copy.
+    """
+
+    def __init__(self, df):
+        symbols = df['TckrSymb'].astype(str).to_numpy()
+        expiries = df['XpryDt'].dt.date.to_numpy()
+        options = df['OptnTp'].astype(str).to_numpy()
+        strikes = df['StrkPric'].to_numpy(dtype=np.float64)
+        tokens = df['FinInstrmId'].to_numpy(dtype=np.int64)
+
+        keys = pd.DataFrame({'s': symbols, 'e': expiries, 'o': options})
+        chains, order, start = {}, [], 0
+        for (symbol, expiry, option), rows in keys.groupby(['s', 'e', 'o'], sort=False).indices.items():
+            order.append(rows[np.argsort(strikes[rows], kind='stable')])
+            chains[(symbol, expiry, option)] = (start, start + len(rows))
+            start += len(rows)
+        order = np.concatenate(order) if order else np.zeros(0, dtype=np.int64)
+        self._set(strikes[order], tokens[order], chains)
+
+    def _set(self, strikes, tokens, chains):
+        self._strikes = strikes
+        self._tokens = tokens
+        self._chains = chains  # (symbol, expiry date, option) -> (start, end) into the arrays
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def _chain(self, symbol, expiry, option):
+        bounds = self._chains.get((symbol, to_expiry_date(expiry), option))
+        if bounds is None:
+            return None
+        start, end = bounds
+        return self._strikes[start:end], self._tokens[start:end]
+
+    def lookup(self, symbol, expiry, strike, option):
+        chain = self._chain(symbol, expiry, option)
+        if chain is not None:
+            chain_strikes, chain_tokens = chain
+            pos = int(np.searchsorted(chain_strikes, float(strike)))
+            if pos < len(chain_strikes) and chain_strikes[pos] == float(strike):
+                return int(chain_tokens[pos])
+        raise KeyError(f"No contract for {symbol} {expiry} {strike} {option}")
+
+    def lookup_many(self, symbol, expiry, strikes, option):
+        """Resolve many strikes at once; missing strikes come back as -1."""
+        strikes = np.asarray(strikes, dtype=np.float64)
+        chain = self._chain(symbol, expiry, option)
+        if chain is None or not len(chain[0]):
+            return np.full(len(strikes), -1, dtype=np.int64)
+        chain_strikes, chain_tokens = chain
+        pos = np.searchsorted(chain_strikes, strikes)
+        pos_clipped = np.minimum(pos, len(chain_strikes) - 1)
+        found = (pos < len(chain_strikes)) & (chain_strikes[pos_clipped] == strikes)
+        return np.where(found, chain_tokens[pos_clipped], -1)
+
+    def save(self, path):
+        """Write the arrays as an Arrow IPC file; chain bounds go in the schema metadata."""
+        chains = [[symbol, expiry.isoformat(), option, start, end]
+                  for (symbol, expiry, option), (start, end) in self._chains.items()]
+        table = pa.table({'strike': self._strikes, 'token': self._tokens},
+                         metadata={'chains': json.dumps(chains)})
+        tmp_path = f'{path}.tmp'
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map an index written by save(); the arrays are zero-copy views of the file."""
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        index = cls.__new__(cls)
+        chains = {(symbol, datetime.strptime(expiry, '%Y-%m-%d').date(), option): (start, end)
+                  for symbol, expiry, option, start, end in json.loads(table.schema.metadata[b'chains'])}
+        index._set(table.column('strike').to_numpy(), table.column('token').to_numpy(), chains)
+        index._table = table  # keeps the mapping alive
+        return index
+
 
 class ContractProcessor:
     _cache = None
+    _index = None
+    _index_path = None  # Arrow copy of the index next to the contract snapshot
 
     def __init__(self, contract_file):
         self.contract_file = contract_file
@@ -38,45 +165,140 @@ class ContractProcessor:
     async def process(self):
         """Process contract file efficiently with caching."""
         if ContractProcessor._cache is None:
-            dtypes = {
-                'FinInstrmId': 'int64', 'UndrlygFinInstrmId': 'int64', 'FinInstrmNm': 'category',
-                'TckrSymb': 'category', 'XpryDt': 'float64', 'StrkPric': 'float64', 'OptnTp': 'category',
-                'StockNm': 'category'
-            }
-            df = pd.read_csv(self.contract_file, usecols=dtypes.keys(), dtype=dtypes)
-            df = df[df['OptnTp'].isin(['CE', 'PE'])]
-            base_date = pd.Timestamp('1980-01-01')
-            df['XpryDt'] = (base_date + pd.to_timedelta(df['XpryDt'] / (60 * 60 * 24), unit='D')).dt.strftime(
-                '%d-%b-%y')
+            df = self._load()
             ContractProcessor._cache = df
+            ContractProcessor._index = ContractIndex(df)
+            if ContractProcessor._index_path is not None and not os.path.exists(ContractProcessor._index_path):
+                ContractProcessor._index.save(ContractProcessor._index_path)
         return ContractProcessor._cache
 
+    def _file_digest(self):
+        digest = hashlib.blake2b(digest_size=16)
+        with open(self.contract_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def snapshot_path(self, digest):
+        return f'{self.contract_file}.{digest}.arrow'
+
+    def _load(self):
+        """
+        Load CE/PE contracts with XpryDt as a datetime64 column.
+        With pyarrow, the parsed table is written once as an Arrow IPC
+        snapshot keyed by the CSV's hash; later starts memory-map it, so
+        processes on the same box share the page cache.
+        """
+        if pa is None:
+            df = pd.read_csv(self.contract_file, usecols=CONTRACT_DTYPES.keys(), dtype=CONTRACT_DTYPES)
+            return self._prepare(df)
+
+        snapshot = self.snapshot_path(self._file_digest())
+        ContractProcessor._index_path = f'{snapshot[:-len(".arrow")]}.index.arrow'
+        if os.path.exists(snapshot):
+            logger.info(f"Loading contract snapshot {snapshot}")
+            with pa.memory_map(snapshot) as source:
+                table = pa.ipc.open_file(source).read_all()
+            return table.to_pandas(split_blocks=True)
+
+        column_types = {
+            name: pa.dictionary(pa.int32(), pa.string()) if dtype == 'category' else pa.from_numpy_dtype(dtype)
+            for name, dtype in CONTRACT_DTYPES.items()
+        }
+        table = pa_csv.read_csv(
+            self.contract_file,
+            convert_options=pa_csv.ConvertOptions(include_columns=list(CONTRACT_DTYPES), column_types=column_types),
+        )
+        df = self._prepare(table.to_pandas())
+
+        tmp_path = f'{snapshot}.tmp'
+        out = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, out.schema) as writer:
+            writer.write_table(out)
+        os.replace(tmp_path, snapshot)
+        logger.info(f"Wrote contract snapshot {snapshot}")
+        return df
+
+    @staticmethod
+    def _prepare(df):
+        df = df[df['OptnTp'].isin(['CE', 'PE'])].reset_index(drop=True)
+        df['XpryDt'] = CONTRACT_EPOCH + pd.to_timedelta(df['XpryDt'], unit='s')
+        return df
+
+    @property
+    def index(self):
+        """Lookup index over the processed contracts (available after process())."""
+        return ContractProcessor._index
+
+    @property
+    def index_path(self):
+        """Memory-mappable copy of the index for other processes; None without pyarrow."""
+        return ContractProcessor._index_path
+
 
 class StopLossTarget:
-    def __init__(self, contract_df):
+    # Hot-path methods timed when a LatencyRecorder is passed: method -> histogram
+    LATENCY_METRICS = {
+        'fetch_prices': 'price_fetch_batch',
+        '_rule_of_strategy': 'entry',
+        '_process_tick_batch': 'exit_evaluation',
+    }
+    JOURNAL_LATENCY_METRICS = {'_write_rows': 'journal_write'}  # runs on the writer thread
+
+    def __init__(self, contract_df, contract_index=None, tick_bus=None, journal=None, clock=None,
+                 market_data=None, latency=None):
+        """
+        clock and market_data (a MarketDataAdapter) default to wall-clock time
+        and the live API behind a short-TTL quote cache; replay injects
+        recorded data instead. latency (a LatencyRecorder) turns on hot-path
+        timing; without it no method is wrapped.
+        """
         self.contract_df = contract_df
-        self.trades = deque()  # Faster than list for popping
-        self.pnl_data = []  # List instead of DataFrame for speed
-        self.expiry_date = '23-Jan-25'
-        self.write_buffer = []  # Buffer for batched file writes
+        self.contract_index = contract_index if contract_index is not None else ContractIndex(contract_df)
+        self.tick_bus = tick_bus if tick_bus is not None else TickBus()
+        self.trades = {}  # trade id -> open leg; legs subscribe to their token on the tick bus
+        self._trade_ids = itertools.count(1)
+        self.book = PositionBook()  # open legs' prices, SL/target/exit time as arrays
+        self.leg_info = {}  # open trade id -> (strategy id, trade number, token, option) for P&L rows
+        self.pnl = PnLAggregator()  # running MTM per strategy / trade number / portfolio
+        self.entries_done = False
+        self.exit_counts = Counter()
+        self.clock = clock if clock is not None else datetime.now
+        self.market_data = market_data if market_data is not None else QuoteCache(CallableAdapter(
+            lambda token: int(track_option_data(int(token))) / 100,
+            lambda index: float(track_spot_price(index)),
+        ))
+        self.expiry_date = to_expiry_date('23-Jan-25')
+        self.journal = journal if journal is not None else TradeJournal()  # Background batched writer
+        self.latency = latency if latency is not None else NULL_RECORDER
+        self.latency.instrument(self, self.LATENCY_METRICS)
+        if hasattr(self.journal, '_write_rows'):
+            self.latency.instrument(self.journal, self.JOURNAL_LATENCY_METRICS)
 
     async def append_sl_tgt(self, trade_book):
         """Append trade asynchronously."""
         await self._rule_of_strategy(trade_book)
 
+    def fetch_price(self, token):
+        return self.market_data.get_quote(token)
+
+    def fetch_prices(self, tokens):
+        """Batch quotes; duplicate tokens across strategies are fetched once."""
+        return self.market_data.get_quotes(tokens)
+
     async def track_live_price(self, token):
-        return int(track_option_data(int(token))) / 100
+        return self.fetch_price(token)
 
     async def track_curr_time(self):
-        return datetime.now().strftime('%H:%M:%S')
+        return self.clock().strftime('%H:%M:%S')
 
     async def _rule_of_strategy(self, trade_book):
         """Optimized trading rule logic."""
         symbol = trade_book.get('symbol', 'NIFTY')
         strike_selection = int(trade_book.get('strike_selection', '0'))
         ce_token, pe_token, _, _ = await self._strike_selection(strike_selection, symbol)
-        ce_price = await self.track_live_price(ce_token)
-        pe_price = await self.track_live_price(pe_token)
+        quotes = self.fetch_prices([ce_token, pe_token])
+        ce_price, pe_price = quotes[ce_token], quotes[pe_token]
 
         strategy_id = trade_book['strategy_id']
         trade_number = trade_book['trade_number']
@@ -94,17 +316,56 @@ class StopLossTarget:
         pe_dict = {'token': pe_token, 'entry_price': pe_price, 'stoploss': pe_sl, 'target': pe_tgt,
                    'exit_time': exit_time, 'strategy_id': strategy_id, 'trade_number': trade_number, 'type': 'Normal'}
 
-        self.pnl_data.extend([
-            {'Trade_Strategy': strategy_id, 'trade_number': trade_number, 'token_number': ce_token, 'option': 'ce',
-             'entry_price': ce_price, 'curr_price_or_price': None},
-            {'Trade_Strategy': strategy_id, 'trade_number': trade_number, 'token_number': pe_token, 'option': 'pe',
-             'entry_price': pe_price, 'curr_price_or_price': None}
-        ])
-        self.trades.extend([ce_dict, pe_dict])
+        self._open_trade(ce_dict, 'ce')
+        self._open_trade(pe_dict, 'pe')
+
+    def _open_trade(self, trade, option=None):
+        """Register an open leg: add it to the position book and subscribe it to its token."""
+        trade_id = next(self._trade_ids)
+        self.trades[trade_id] = trade
+        self.leg_info[trade_id] = (trade['strategy_id'], trade['trade_number'], trade['token'], option)
+        self.book.add(trade_id, int(trade['token']), trade['entry_price'], trade['stoploss'], trade['target'],
+                      at_time_today(trade['exit_time'], self.clock()).timestamp())
+        self.pnl.add_leg(trade_id, trade['strategy_id'], trade['trade_number'], trade['entry_price'])
+        self.tick_bus.subscribe(trade['token'], trade_id)
+        self.tick_bus.wake()  # the tracking loop may be waiting on a later exit time
+        return trade_id
+
+    @property
+    def pnl_data(self):
+        """Per-leg P&L rows for open legs, built from the position book on demand."""
+        book = self.book
+        return [
+            {'Trade_Strategy': strategy_id, 'trade_number': trade_number, 'token_number': token, 'option': option,
+             'entry_price': float(book.entry[row]), 'curr_price_or_price': float(book.curr_price[row])}
+            for row, (strategy_id, trade_number, token, option) in enumerate(
+                self.leg_info[trade_id] for trade_id in book.trade_id[:len(book)])
+        ]
+
+    def strategy_mtm(self):
+        """MTM per strategy id over every leg (open and closed), from the running rollup."""
+        return dict(self.pnl.by_strategy)
+
+    def _close_trade(self, trade_id, curr_price, curr_time, exit_type):
+        trade = self.trades.pop(trade_id)
+        self.book.close(trade_id)
+        self.leg_info.pop(trade_id, None)
+        self.pnl.close(trade_id, curr_price)
+        self.tick_bus.unsubscribe(trade['token'], trade_id)
+        trade['Exit Price'] = curr_price
+        trade['Trade Exit'] = curr_time
+        trade['Type'] = exit_type
+        self.exit_counts[exit_type] += 1
+        self.journal.write(trade)
+
+    def finish_entries(self):
+        """No more entries will come; the tracking loop ends once open legs close."""
+        self.entries_done = True
+        self.tick_bus.wake()
 
     async def _strike_selection(self, strike_selection, symbol):
         if strike_selection == 0:
-            curr_price = float(track_spot_price('Nifty 50' if symbol.lower() == 'nifty' else symbol))
+            curr_price = self.market_data.get_spot('Nifty 50' if symbol.lower() == 'nifty' else symbol)
             strike_price = int(round(curr_price / 50) * 50)
             ce_strike = strike_price + 50
             pe_strike = strike_price - 50
@@ -114,68 +375,66 @@ class StopLossTarget:
         # Add other strike_selection logic if needed
 
     async def _get_token_number(self, strike_price, option):
-        df = self.contract_df
-        token = df[(df['XpryDt'] == self.expiry_date) & (df['TckrSymb'] == 'NIFTY') &
-                   (df['StrkPric'] == strike_price) & (df['OptnTp'] == option)]['FinInstrmId'].iloc[0]
-        return token
+        return self.contract_index.lookup('NIFTY', self.expiry_date, strike_price, option)
+
+    async def _get_token_numbers(self, strike_prices, option):
+        """Batch strike -> token lookup; -1 where no contract exists."""
+        return self.contract_index.lookup_many('NIFTY', self.expiry_date, strike_prices, option)
 
     async def track_live_trade(self):
-        """Async live trade tracking with minimal latency."""
-        while self.trades:
-            tasks = [self._process_trade(trade) for trade in self.trades]
-            results = await asyncio.gather(*tasks)
-            self.trades = deque(trade for trade, keep in zip(self.trades, results) if keep)
-            if len(self.write_buffer) > 100:  # Batch write every 100 trades
-                await self._flush_write_buffer()
-            await asyncio.sleep(0.001)  # Minimal polling delay
-
-    async def _process_trade(self, trade):
-        curr_price = await self.track_live_price(trade['token'])
-        curr_time = await self.track_curr_time()
-        for entry in self.pnl_data:
-            if entry['trade_number'] == trade['trade_number'] and entry['token_number'] == trade['token']:
-                entry['curr_price_or_price'] = curr_price
-                break
-
-        if curr_price >= trade['stoploss']:
-            trade['Exit Price'] = curr_price
-            trade['Trade Exit'] = curr_time
-            trade['Type'] = 'Stoploss'
-            self.write_buffer.append(trade)
-            return False
-        elif curr_price <= trade['target']:
-            trade['Exit Price'] = curr_price
-            trade['Trade Exit'] = curr_time
-            trade['Type'] = 'Target'
-            self.write_buffer.append(trade)
-            return False
-        elif curr_time >= trade['exit_time']:
-            trade['Exit Price'] = curr_price
-            trade['Trade Exit'] = curr_time
-            trade['Type'] = 'Time'
-            self.write_buffer.append(trade)
-            return False
-        return True
+        """
+        Event-driven trade tracking: each tick batch updates the position
+        book and every open leg's exit conditions are checked in one pass.
+        """
+        latency = self.latency
+        try:
+            while self.trades or not self.entries_done:
+                batch = await self.tick_bus.next_batch(timeout=self._seconds_to_next_exit())
+                if latency.enabled:
+                    start = time.perf_counter_ns()
+                curr_time = await self.track_curr_time()
+                await self._process_tick_batch(batch, curr_time)
+                if latency.enabled:
+                    end = time.perf_counter_ns()
+                    latency.record('loop_cycle', end - start)
+                    if batch:  # oldest tick in the batch published -> exits decided
+                        latency.record('tick_to_decision', end - self.tick_bus.batch_published_ns)
+        finally:
+            await self.journal.close()  # Final flush on shutdown
+
+    def _seconds_to_next_exit(self):
+        next_exit = self.book.next_exit_ts()
+        if next_exit is None:
+            return None
+        return max(0.0, next_exit - self.clock().timestamp())
+
+    async def _process_tick_batch(self, batch, curr_time):
+        """Apply a {token: price} batch and close every leg that hit SL, target or exit time."""
+        if batch:
+            self.book.update_prices([int(token) for token in batch], list(batch.values()))
+            for token, curr_price in batch.items():
+                for trade_id in self.tick_bus.subscribers(token):
+                    self.pnl.update(trade_id, curr_price)
+        trade_ids, codes, prices = self.book.due_exits(self.clock().timestamp())
+        for trade_id, code, curr_price in zip(trade_ids.tolist(), codes.tolist(), prices.tolist()):
+            if code == EXIT_TIME:
+                # No tick since entry: fall back to the latest known price
+                token = self.trades[trade_id]['token']
+                curr_price = self.tick_bus.last_price.get(token, curr_price)
+            self._close_trade(trade_id, curr_price, curr_time, EXIT_TYPES[code])
+        self.pnl.publish()
 
     async def _flush_write_buffer(self):
-        """Batch write to CSV asynchronously."""
-        if not self.write_buffer:
-            return
-        file_path = f'{datetime.now().strftime("%Y-%m-%d")}_data.csv'
-        async with aiofiles.open(file_path, 'a') as f:
-            if not os.path.exists(file_path):
-                await f.write(','.join(self.write_buffer[0].keys()) + '\n')
-            for trade in self.write_buffer:
-                await f.write(','.join(str(trade.get(k, '')) for k in trade) + '\n')
-        self.write_buffer.clear()
+        """Force queued exits to disk; the journal otherwise flushes on size or time."""
+        await self.journal.flush()
 
 
 class StopLossTargetOptionEntryTrack:
-    def __init__(self, contract_df):
+    def __init__(self, contract_df, contract_index=None, sl_tg_obj=None):
         self.contract_df = contract_df
         self.trade_queue = deque()
         self.trades_by_time = defaultdict(list)
-        self.sl_tg_obj = StopLossTarget(contract_df)
+        self.sl_tg_obj = sl_tg_obj if sl_tg_obj is not None else StopLossTarget(contract_df, contract_index)
 
     def _append_in_queue(self, key, trade_book):
         trade_book['strategy_id'] = key
@@ -203,20 +462,207 @@ class StopLossTargetOptionEntryTrack:
             curr += timedelta(minutes=gap_minutes)
         return times
 
-    async def manage_run(self):
-        """Run trade tracking and live monitoring concurrently."""
-        await asyncio.gather(self._track_entries(), self.sl_tg_obj.track_live_trade())
+    async def manage_run(self, tick_source=None, pnl_port=None, metrics_file=None, metrics_port=None,
+                         metrics_interval=10.0):
+        """
+        Run entries and live monitoring concurrently. Without a push feed,
+        prices are polled only for subscribed tokens and pushed on change.
+        With pnl_port, the P&L rollup is served as JSON on localhost. When
+        latency is recorded, event-loop lag is sampled too, and histograms
+        go to metrics_file every metrics_interval seconds and/or to a
+        Prometheus endpoint on metrics_port.
+        """
+        latency = self.sl_tg_obj.latency
+        if tick_source is None:
+            tick_source = PollingTickSource(self.sl_tg_obj.tick_bus, self.sl_tg_obj.fetch_prices)
+        servers = []
+        if pnl_port is not None:
+            servers.append(PnLServer(self.sl_tg_obj.pnl, port=pnl_port))
+        if latency.enabled and metrics_port is not None:
+            servers.append(MetricsServer(latency, port=metrics_port))
+        for server in servers:
+            await server.start()
+        stop_event = asyncio.Event()
+        background = [asyncio.create_task(tick_source.run(stop_event))]
+        if latency.enabled:
+            background.append(asyncio.create_task(monitor_loop_lag(latency, stop_event)))
+            if metrics_file is not None:
+                background.append(asyncio.create_task(
+                    export_periodically(latency, stop_event, metrics_file, metrics_interval)))
+        try:
+            await asyncio.gather(self._track_entries(), self.sl_tg_obj.track_live_trade())
+        finally:
+            stop_event.set()
+            await asyncio.gather(*background)
+            for server in servers:
+                await server.close()
+
+    def build_entry_schedule(self, now):
+        """Move mapped entry times at or after now onto a timer heap."""
+        scheduler = EntryScheduler(clock=self.sl_tg_obj.clock)
+        for entry_time, trades in self.trades_by_time.items():
+            when = at_time_today(entry_time, now)
+            if when < now:
+                logger.info(f"Skipping entry time {entry_time}: already passed")
+                continue
+            scheduler.add(when, trades)
+        self.trades_by_time.clear()
+        return scheduler
+
+    async def enter_trades(self, trades):
+        for trade in trades:
+            await self.sl_tg_obj.append_sl_tgt(trade)
 
     async def _track_entries(self):
-        sorted_times = sorted(self.trades_by_time.keys())
-        while sorted_times:
-            curr_time = await self.sl_tg_obj.track_curr_time()
-            if curr_time in self.trades_by_time:
-                for trade in self.trades_by_time[curr_time]:
-                    await self.sl_tg_obj.append_sl_tgt(trade)
-                del self.trades_by_time[curr_time]
-                sorted_times = [t for t in sorted_times if t > curr_time]
-            await asyncio.sleep(0.001)
+        """Fire entries from a timer heap instead of polling the clock."""
+        scheduler = self.build_entry_schedule(self.sl_tg_obj.clock())
+        try:
+            await scheduler.run(self.enter_trades)
+        finally:
+            self.sl_tg_obj.finish_entries()
+
+
+class QueueJournal:
+    """Journal stand-in for shard workers: exits are forwarded to the coordinator."""
+
+    def __init__(self, events):
+        self.events = events
+
+    def write(self, trade):
+        self.events.put(('exit', dict(trade), None))
+
+    async def flush(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+def _shard_worker(worker_id, contract_file, index_path, strategies, events, pnl_interval):
+    asyncio.run(_run_shard(worker_id, contract_file, index_path, strategies, events, pnl_interval))
+
+
+async def _run_shard(worker_id, contract_file, index_path, strategies, events, pnl_interval):
+    """
+    Run one shard of strategies. Workers only need the contract index, which
+    is memory-mapped from the coordinator's snapshot; without pyarrow they
+    fall back to loading the contract file themselves.
+    """
+    if index_path is not None:
+        contract_df, contract_index = None, ContractIndex.load(index_path)
+    else:
+        processor = ContractProcessor(contract_file)
+        contract_df = await processor.process()
+        contract_index = processor.index
+    tracker = StopLossTargetOptionEntryTrack(contract_df, contract_index)
+    engine = tracker.sl_tg_obj
+    engine.journal = QueueJournal(events)
+    for key, trade_book in strategies.items():
+        tracker._append_in_queue(key, trade_book)
+    await tracker.mapping_the_trade()
+
+    async def report_pnl():
+        while True:
+            await asyncio.sleep(pnl_interval)
+            events.put(('pnl', worker_id, engine.strategy_mtm()))
+
+    reporter = asyncio.create_task(report_pnl())
+    try:
+        await tracker.manage_run()
+    finally:
+        reporter.cancel()
+        events.put(('pnl', worker_id, engine.strategy_mtm()))
+        events.put(('done', worker_id, None))
+
+
+class ShardCoordinator:
+    """
+    Shards strategies across worker processes (one per core by default).
+    The parent loads the contract file once and workers memory-map the
+    index snapshot it wrote, so the lookup arrays are shared through the
+    page cache; exits and P&L stream back over one queue and are
+    aggregated here, with exits written to a single journal.
+    """
+
+    def __init__(self, contract_file, config_dict, workers=None, pnl_interval=1.0, journal=None, pnl_port=None):
+        self.contract_file = contract_file
+        self.config_dict = config_dict
+        self.workers = min(workers or os.cpu_count() or 1, max(len(config_dict), 1))
+        self.pnl_interval = pnl_interval
+        self.journal = journal if journal is not None else TradeJournal()
+        self.exit_counts = Counter()
+        self.pnl_by_worker = {}
+        self.pnl_port = pnl_port
+
+    def shards(self):
+        shards = [{} for _ in range(self.workers)]
+        for i, (key, trade_book) in enumerate(self.config_dict.items()):
+            shards[i % self.workers][key] = trade_book
+        return shards
+
+    def pnl(self):
+        """Latest MTM per strategy across workers, plus the portfolio total."""
+        totals = defaultdict(float)
+        for strategy_pnl in self.pnl_by_worker.values():
+            for strategy_id, mtm in strategy_pnl.items():
+                totals[strategy_id] += mtm
+        totals['portfolio'] = sum(totals.values())
+        return dict(totals)
+
+    def snapshot(self):
+        """Rollup served by PnLServer in sharded mode."""
+        pnl = self.pnl()
+        return {'total': pnl.pop('portfolio'), 'strategies': pnl, 'exits': dict(self.exit_counts)}
+
+    async def run(self):
+        # Build the snapshots before workers start so none of them reads the CSV
+        processor = ContractProcessor(self.contract_file)
+        await processor.process()
+
+        ctx = multiprocessing.get_context('spawn')
+        events = ctx.Queue()
+        processes = [
+            ctx.Process(target=_shard_worker,
+                        args=(worker_id, self.contract_file, processor.index_path, shard, events,
+                              self.pnl_interval), daemon=True)
+            for worker_id, shard in enumerate(self.shards())
+        ]
+        for process in processes:
+            process.start()
+        server = None
+        if self.pnl_port is not None:
+            server = PnLServer(self, port=self.pnl_port)
+            await server.start()
+
+        loop = asyncio.get_running_loop()
+        running = set(range(len(processes)))
+        try:
+            while running:
+                try:
+                    kind, source, payload = await loop.run_in_executor(None, events.get, True, 0.5)
+                except queue.Empty:
+                    # A worker that died without reporting would otherwise stall the run
+                    for worker_id in list(running):
+                        if not processes[worker_id].is_alive():
+                            logger.error(f"Shard worker {worker_id} exited with code {processes[worker_id].exitcode}")
+                            running.discard(worker_id)
+                    continue
+                if kind == 'exit':
+                    trade = source
+                    self.exit_counts[trade['Type']] += 1
+                    self.journal.write(trade)
+                elif kind == 'pnl':
+                    self.pnl_by_worker[source] = payload
+                elif kind == 'done':
+                    running.discard(source)
+        finally:
+            await self.journal.close()
+            for process in processes:
+                process.join()
+            if server is not None:
+                await server.close()
+        logger.info(f"Exits: {dict(self.exit_counts)} | P&L: {self.pnl()}")
+        return self.pnl()
 
 
 class TradeTake:
@@ -231,19 +677,43 @@ class TradeTake:
     def _load_config(self):
         return get_ini_details(self.config_file)
 
-    async def load_strategy(self):
+    async def load_strategy(self, workers=None, pnl_port=None, metrics_file=None, metrics_port=None):
+        """
+        Run every strategy on this loop, or shard them across worker processes.
+        Latency instrumentation is on only when metrics_file or metrics_port is given.
+        """
+        instrumented = metrics_file is not None or metrics_port is not None
+        if workers and workers > 1:
+            if instrumented:
+                logger.warning("Latency metrics are recorded in single-loop mode only")
+            return await ShardCoordinator(self.CONTRACT_FILE_PATH, self.config_dict, workers,
+                                          pnl_port=pnl_port).run()
+
         contract_df = await self.processor.process()
-        tracker = StopLossTargetOptionEntryTrack(contract_df)
-        with ThreadPoolExecutor() as executor:
-            executor.map(lambda kv: tracker._append_in_queue(kv[0], kv[1]), self.config_dict.items())
+        engine = StopLossTarget(contract_df, self.processor.index,
+                                latency=LatencyRecorder() if instrumented else None)
+        tracker = StopLossTargetOptionEntryTrack(contract_df, self.processor.index, engine)
+        for key, trade_book in self.config_dict.items():
+            tracker._append_in_queue(key, trade_book)
         await tracker.mapping_the_trade()
-        await tracker.manage_run()
+        await tracker.manage_run(pnl_port=pnl_port, metrics_file=metrics_file, metrics_port=metrics_port)
 
 
-async def main():
+async def main(workers=None, pnl_port=None, metrics_file=None, metrics_port=None):
     trade = TradeTake('config.ini')
-    await trade.load_strategy()
+    await trade.load_strategy(workers, pnl_port, metrics_file, metrics_port)
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=None,
+                        help='shard strategies across this many processes (default: single loop)')
+    parser.add_argument('--pnl-port', type=int, default=None, help='serve the P&L rollup as JSON on this port')
+    parser.add_argument('--metrics-file', default=None,
+                        help='record hot-path latency and write Prometheus text to this file periodically')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='record hot-path latency and serve it as Prometheus text on this port')
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.pnl_port, args.metrics_file, args.metrics_port))
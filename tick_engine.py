@@ -0,0 +1,158 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import defaultdict
+from datetime import datetime
+
+
+class TickBus:
+    """
+    Per-token price subscriptions. Feeds push ticks in; consumers take
+    them in batches with only the latest price per token kept.
+    """
+
+    def __init__(self):
+        self._queue = asyncio.Queue()
+        self._subscribers = defaultdict(set)
+        self.last_price = {}
+        self.batch_published_ns = None  # perf_counter_ns of the oldest tick in the last batch
+        self._first_tick_ns = None
+
+    def subscribe(self, token, key):
+        self._subscribers[token].add(key)
+
+    def unsubscribe(self, token, key):
+        keys = self._subscribers.get(token)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._subscribers[token]
+
+    def subscribers(self, token):
+        return self._subscribers.get(token, ())
+
+    @property
+    def tokens(self):
+        return list(self._subscribers)
+
+    def publish(self, token, price):
+        """Push a tick; ticks for tokens nobody follows are dropped."""
+        if token in self._subscribers:
+            if self._first_tick_ns is None:
+                self._first_tick_ns = time.perf_counter_ns()  # one clock read per batch
+            self._queue.put_nowait((token, price))
+
+    def wake(self):
+        """Unblock a waiting consumer without delivering a tick."""
+        self._queue.put_nowait((None, None))
+
+    async def next_batch(self, timeout=None):
+        """
+        Wait for at least one tick, then drain whatever else is queued.
+        Returns {token: latest price}, or {} if timeout passes first.
+        """
+        try:
+            token, price = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return {}
+        batch = {token: price}
+        while not self._queue.empty():
+            token, price = self._queue.get_nowait()
+            batch[token] = price
+        batch.pop(None, None)  # wake() markers
+        self.batch_published_ns, self._first_tick_ns = self._first_tick_ns, None
+        self.last_price.update(batch)
+        return batch
+
+
+class EntryScheduler:
+    """Timer heap of scheduled entries; sleeps until the next one is due."""
+
+    def __init__(self, clock=datetime.now):
+        self.clock = clock
+        self._heap = []
+        self._counter = itertools.count()  # tie-break so items are never compared
+
+    def __len__(self):
+        return len(self._heap)
+
+    def add(self, when, item):
+        heapq.heappush(self._heap, (when, next(self._counter), item))
+
+    def pop_due(self):
+        now = self.clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    def seconds_until_next(self):
+        if not self._heap:
+            return None
+        return max(0.0, (self._heap[0][0] - self.clock()).total_seconds())
+
+    async def run(self, callback):
+        """Await callback(item) for every item at its scheduled time."""
+        while self._heap:
+            await asyncio.sleep(self.seconds_until_next())
+            for item in self.pop_due():
+                await callback(item)
+
+
+class PollingTickSource:
+    """
+    Bridge for price APIs without a push feed: polls the subscribed tokens
+    in one batch call (fetch_prices(tokens) -> {token: price}) and
+    publishes prices that changed.
+    """
+
+    def __init__(self, bus, fetch_prices, interval=0.25):
+        self.bus = bus
+        self.fetch_prices = fetch_prices
+        self.interval = interval
+        self.published = 0
+        self._last = {}
+
+    async def run(self, stop_event):
+        while not stop_event.is_set():
+            tokens = self.bus.tokens
+            prices = self.fetch_prices(tokens) if tokens else {}
+            for token, price in prices.items():
+                if self._last.get(token) != price:
+                    self._last[token] = price
+                    self.bus.publish(token, price)
+                    self.published += 1
+            try:
+                await asyncio.wait_for(stop_event.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+class SimulatedTickFeed:
+    """Local random-walk tick feed for benchmarking the engine offline."""
+
+    def __init__(self, bus, prices, interval=0.001, volatility=0.002, ticks_per_round=None, seed=None):
+        self.bus = bus
+        self.prices = dict(prices)
+        self.interval = interval
+        self.volatility = volatility
+        self.ticks_per_round = ticks_per_round
+        self.published = 0
+        self._random = random.Random(seed)
+
+    def add_token(self, token, price):
+        self.prices[token] = price
+
+    async def run(self, stop_event):
+        tokens = list(self.prices)
+        while not stop_event.is_set():
+            burst = tokens if self.ticks_per_round is None else self._random.sample(
+                tokens, min(self.ticks_per_round, len(tokens)))
+            for token in burst:
+                price = self.prices[token] * (1 + self._random.gauss(0, self.volatility))
+                self.prices[token] = round(price, 2)
+                self.bus.publish(token, self.prices[token])
+                self.published += 1
+            await asyncio.sleep(self.interval)
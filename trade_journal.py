@@ -0,0 +1,194 @@
+import asyncio
+import csv
+import io
+import logging
+import os
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # columnar formats need pyarrow; CSV always works
+    pa = None
+
+# Stable column order for every journal format
+JOURNAL_COLUMNS = ['strategy_id', 'trade_number', 'token', 'type', 'entry_price', 'stoploss', 'target',
+                   'exit_time', 'Exit Price', 'Trade Exit', 'Type']
+FLOAT_COLUMNS = {'entry_price', 'stoploss', 'target', 'Exit Price'}
+
+FSYNC_ALWAYS = 'always'  # fsync after every flush
+FSYNC_CLOSE = 'close'  # fsync once on shutdown
+FSYNC_NEVER = 'never'  # leave it to the OS
+
+logger = logging.getLogger(__name__)
+
+
+def _journal_schema():
+    return pa.schema([(name, pa.float64() if name in FLOAT_COLUMNS else pa.string()) for name in JOURNAL_COLUMNS])
+
+
+class TradeJournal:
+    """
+    Background trade-journal writer. Rows are queued without blocking the
+    tick path; a writer task flushes them when max_rows are waiting or
+    max_delay seconds after the first unflushed row, whichever comes first.
+    Formats: 'csv' (header once, stable columns), 'parquet' or 'arrow'
+    (one row group / record batch per flush).
+    If a write fails the writer stops: rows it could not write are kept in
+    unwritten, pending flushes fail, and write(), flush() and close()
+    raise the original error.
+    """
+
+    def __init__(self, path=None, fmt='csv', max_rows=100, max_delay=1.0, fsync=FSYNC_CLOSE):
+        if fmt not in ('csv', 'parquet', 'arrow'):
+            raise ValueError(f"Unknown journal format: {fmt}")
+        if fmt != 'csv' and pa is None:
+            raise ImportError(f"pyarrow is required for the {fmt} journal format")
+        self.fmt = fmt
+        self.path = path or self.default_path(fmt)
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.fsync = fsync
+        self.rows_written = 0
+        self.unwritten = []
+        self._error = None
+        self._queue = None
+        self._task = None
+        self._file = None
+        self._writer = None
+        self._schema = _journal_schema() if pa is not None else None
+
+    @staticmethod
+    def default_path(fmt):
+        now = datetime.now()
+        if fmt == 'csv':
+            return f'{now.strftime("%Y-%m-%d")}_data.csv'
+        # Columnar files cannot be appended to across runs, so each run gets its own part
+        return f'{now.strftime("%Y-%m-%d")}_data-{now.strftime("%H%M%S")}.{fmt}'
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            raise self._error
+
+    def write(self, trade):
+        """Queue one exited trade; never blocks."""
+        self._raise_if_failed()
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        self._queue.put_nowait(trade)
+
+    async def flush(self):
+        """Write everything queued so far and wait until it is on disk."""
+        self._raise_if_failed()
+        if self._task is None or self._task.done():
+            return
+        done = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(done)
+        await done
+
+    async def close(self):
+        """Final flush, then close the file (fsync unless the policy is 'never')."""
+        try:
+            if self._task is not None and not self._task.done():
+                self._queue.put_nowait(None)
+                await self._task
+            elif self._task is not None and not self._task.cancelled():
+                self._task.exception()  # a crashed writer's error is raised below
+        finally:
+            self._task = None
+            if self._file is not None:
+                await asyncio.to_thread(self._close_file)
+        self._raise_if_failed()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        pending = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                item = ...
+
+            if isinstance(item, dict):
+                pending.append(item)
+                if deadline is None:
+                    deadline = loop.time() + self.max_delay
+                if len(pending) < self.max_rows:
+                    continue
+
+            if pending:
+                rows, pending, deadline = pending, [], None
+                try:
+                    await asyncio.to_thread(self._write_rows, rows)
+                except Exception as e:
+                    self._fail(e, rows, item)
+                    raise
+            if isinstance(item, asyncio.Future):
+                item.set_result(None)
+            elif item is None:
+                return
+
+    def _fail(self, error, rows, item):
+        """Keep every row not yet written and fail flushes waiting on the writer."""
+        self._error = error
+        self.unwritten.extend(rows)
+        waiting = [] if isinstance(item, dict) else [item]  # a dict item is already in rows
+        while not self._queue.empty():
+            waiting.append(self._queue.get_nowait())
+        for queued in waiting:
+            if isinstance(queued, dict):
+                self.unwritten.append(queued)
+            elif isinstance(queued, asyncio.Future) and not queued.done():
+                queued.set_exception(error)
+        logger.error(f"Trade journal {self.path} failed, {len(self.unwritten)} rows not written: {error!r}")
+
+    def _write_rows(self, rows):
+        if self._file is None:
+            self._open_file()
+
+        if self.fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=JOURNAL_COLUMNS, extrasaction='ignore')
+            writer.writerows(rows)
+            self._file.write(buffer.getvalue())
+            self._file.flush()
+        else:
+            columns = {
+                name: [None if row.get(name) is None else
+                       float(row[name]) if name in FLOAT_COLUMNS else str(row[name]) for row in rows]
+                for name in JOURNAL_COLUMNS
+            }
+            self._writer.write_table(pa.Table.from_pydict(columns, schema=self._schema))
+
+        self.rows_written += len(rows)
+        if self.fsync == FSYNC_ALWAYS:
+            self._fsync()
+
+    def _open_file(self):
+        if self.fmt == 'csv':
+            self._file = open(self.path, 'a', newline='')
+            # Header only when starting a new (or empty) file
+            if self._file.tell() == 0:
+                csv.DictWriter(self._file, fieldnames=JOURNAL_COLUMNS).writeheader()
+        elif self.fmt == 'parquet':
+            self._file = open(self.path, 'wb')
+            self._writer = pq.ParquetWriter(self._file, self._schema)
+        else:
+            self._file = open(self.path, 'wb')
+            self._writer = pa.ipc.new_file(self._file, self._schema)
+
+    def _fsync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _close_file(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self.fsync != FSYNC_NEVER:
+            self._fsync()
+        self._file.close()
+        self._file = None
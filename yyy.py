@@ -1,79 +1,164 @@
-from playwright.sync_api import sync_playwright
-import pandas as pd
-
-
-def scrape_scorecard(url):
-    with sync_playwright() as p:
-        # Launch browser in headless mode
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-
-        # Go to the scorecard URL
-        page.goto(url)
-
-        # Wait for scorecard content to load (adjust selector based on actual HTML)
-        page.wait_for_selector(".scorecard-container", timeout=10000)  # Hypothetical class
-
-        # Extract batting data for both innings (assuming two innings tables)
-        innings_1 = page.query_selector(".innings-1")  # Adjust selector
-        innings_2 = page.query_selector(".innings-2")  # Adjust selector
-
-        # Parse batting tables (example assumes tables with rows for players)
-        batting_1 = parse_batting_table(innings_1)
-        batting_2 = parse_batting_table(innings_2)
-
-        # Extract bowling data (similar approach)
-        bowling_1 = parse_bowling_table(innings_1)
-        bowling_2 = parse_bowling_table(innings_2)
-
-        # Close browser
-        browser.close()
-
-        return {
-            "Team 1 (SACA)": {"Batting": batting_1, "Bowling": bowling_1},
-            "Team 2 (VIC)": {"Batting": batting_2, "Bowling": bowling_2}
-        }
+import asyncio
+import json
+from contextlib import asynccontextmanager
 
+from playwright.async_api import async_playwright
+import pandas as pd
 
-def parse_batting_table(innings):
-    # Extract rows from batting table
-    rows = innings.query_selector_all("tr")  # Adjust based on HTML structure
+from http_cache import ResponseCache, ttl_for_status
+
+# Requests the scorecard never needs; aborting them cuts page load time
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_HOSTS = (
+    "doubleclick.net", "googlesyndication.com", "googletagservices.com",
+    "google-analytics.com", "googletagmanager.com", "adservice.google.com",
+)
+
+INNINGS_SELECTORS = [".innings-1", ".innings-2"]  # Adjust selector
+
+# One round-trip: every row's cell texts for each innings (header row skipped)
+EXTRACT_TABLES_JS = """
+(selectors) => {
+    const rows = (root, selector) => root
+        ? Array.from(root.querySelectorAll(selector)).slice(1)
+            .map(tr => Array.from(tr.querySelectorAll("td")).map(td => td.innerText))
+        : [];
+    return selectors.map(selector => {
+        const innings = document.querySelector(selector);
+        return {batting: rows(innings, "tr"), bowling: rows(innings, ".bowling-table tr")};
+    });
+}
+"""
+
+
+async def _block_heavy_resources(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(host in request.url for host in BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class BrowserPool:
+    """Keeps N warm headless browsers and hands out pages from them."""
+
+    def __init__(self, size=2, pages_per_browser=4):
+        self.size = size
+        self.pages_per_browser = pages_per_browser
+        self._playwright = None
+        self._browsers = []
+        self._contexts = []
+        self._next = 0
+        self._semaphore = asyncio.Semaphore(size * pages_per_browser)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        self._playwright = await async_playwright().start()
+        for _ in range(self.size):
+            browser = await self._playwright.chromium.launch(headless=True)
+            context = await browser.new_context()
+            await context.route("**/*", _block_heavy_resources)
+            self._browsers.append(browser)
+            self._contexts.append(context)
+
+    async def close(self):
+        for browser in self._browsers:
+            await browser.close()
+        self._browsers.clear()
+        self._contexts.clear()
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a fresh page from the next warm browser."""
+        async with self._semaphore:
+            context = self._contexts[self._next % len(self._contexts)]
+            self._next += 1
+            page = await context.new_page()
+            try:
+                yield page
+            finally:
+                await page.close()
+
+
+def _rows_cache_key(url):
+    # Distinct from the URL itself, which the HTTP scrapers cache raw pages under
+    return f"{url}#rendered-rows"
+
+
+async def scrape_scorecard(pool, url, cache=None, status=None):
+    # Rows extracted on an earlier run need no browser page at all
+    cached = cache.get(_rows_cache_key(url)) if cache is not None else None
+    if cached is not None:
+        innings_1, innings_2 = json.loads(cached)
+    else:
+        async with pool.page() as page:
+            # Go to the scorecard URL
+            await page.goto(url)
+
+            # Wait for scorecard content to load (adjust selector based on actual HTML)
+            await page.wait_for_selector(".scorecard-container", timeout=10000)  # Hypothetical class
+            innings_1, innings_2 = await page.evaluate(EXTRACT_TABLES_JS, INNINGS_SELECTORS)
+        if cache is not None:
+            cache.put(_rows_cache_key(url), json.dumps([innings_1, innings_2]), ttl_for_status(status))
+
+    return {
+        "Team 1 (SACA)": {"Batting": parse_batting_table(innings_1["batting"]),
+                          "Bowling": parse_bowling_table(innings_1["bowling"])},
+        "Team 2 (VIC)": {"Batting": parse_batting_table(innings_2["batting"]),
+                         "Bowling": parse_bowling_table(innings_2["bowling"])},
+    }
+
+
+async def scrape_scorecards(urls, pool_size=2, pages_per_browser=4, cache=None, status=None):
+    """Scrape many scorecards concurrently on a pool of warm browsers."""
+    async with BrowserPool(pool_size, pages_per_browser) as pool:
+        return await asyncio.gather(*(scrape_scorecard(pool, url, cache, status) for url in urls))
+
+
+def parse_batting_table(rows):
+    # rows: cell texts per batting table row, header already skipped
     batting_data = []
-    for row in rows[1:]:  # Skip header row
-        cols = row.query_selector_all("td")
+    for cols in rows:
         if len(cols) >= 5:  # Name, Runs, Balls, 4s, 6s (example)
             batting_data.append({
-                "Player": cols[0].inner_text(),
-                "Runs": cols[1].inner_text(),
-                "Balls": cols[2].inner_text(),
-                "4s": cols[3].inner_text(),
-                "6s": cols[4].inner_text()
+                "Player": cols[0],
+                "Runs": cols[1],
+                "Balls": cols[2],
+                "4s": cols[3],
+                "6s": cols[4]
             })
     return batting_data
 
 
-def parse_bowling_table(innings):
+def parse_bowling_table(rows):
     # Similar logic for bowling table
-    rows = innings.query_selector_all(".bowling-table tr")  # Adjust selector
     bowling_data = []
-    for row in rows[1:]:
-        cols = row.query_selector_all("td")
+    for cols in rows:
         if len(cols) >= 5:  # Name, Overs, Runs, Wickets, Economy
             bowling_data.append({
-                "Bowler": cols[0].inner_text(),
-                "Overs": cols[1].inner_text(),
-                "Runs": cols[2].inner_text(),
-                "Wickets": cols[3].inner_text(),
-                "Economy": cols[4].inner_text()
+                "Bowler": cols[0],
+                "Overs": cols[1],
+                "Runs": cols[2],
+                "Wickets": cols[3],
+                "Economy": cols[4]
             })
     return bowling_data
 
 
 # Run the scraper
-url = "https://crex.live/scoreboard/QI6/1N6/Final/3J/3M/saca-vs-vic-final-australia-domestic-oneday-cup-2024-25/scorecard"
-scorecard = scrape_scorecard(url)
-
-# Print or save the result
-import json
+if __name__ == '__main__':
+    url = "https://crex.live/scoreboard/QI6/1N6/Final/3J/3M/saca-vs-vic-final-australia-domestic-oneday-cup-2024-25/scorecard"
+    cache = ResponseCache()
+    scorecard, = asyncio.run(scrape_scorecards([url], cache=cache, status="completed"))
 
-print(json.dumps(scorecard, indent=2))
\ No newline at end of file
+    # Print or save the result
+    print(json.dumps(scorecard, indent=2))